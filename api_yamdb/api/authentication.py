@@ -0,0 +1,192 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import ADMIN_ROLE, MODERATOR_ROLE, User
+
+from .metrics import registry
+
+ROLE_CLAIM = 'role'
+STAFF_CLAIM = 'is_staff'
+USERNAME_CLAIM = 'username'
+
+
+def get_access_token(user):
+    """
+    Access-токен пользователя.
+
+    При STATELESS_JWT_AUTH в токен добавляется роль, достаточная для
+    проверки прав без БД, а срок жизни сокращается до
+    STATELESS_TOKEN_LIFETIME.
+    """
+    token = AccessToken.for_user(user)
+    if not settings.STATELESS_JWT_AUTH:
+        return token
+    token.set_exp(lifetime=settings.STATELESS_TOKEN_LIFETIME)
+    token[ROLE_CLAIM] = user.role
+    token[STAFF_CLAIM] = user.is_staff
+    token[USERNAME_CLAIM] = user.username
+    return token
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей процесса с ограничением размера и TTL.
+
+    Запись удаляется сразу при сохранении или удалении User, поэтому
+    смена роли действует со следующего запроса. Изменения в обход
+    сигналов (queryset.update) и в других процессах видны через TTL.
+
+    Пока строка загружается из БД, для её pk считаются вытеснения:
+    строка, загруженная до сохранения пользователя, которое произошло
+    во время загрузки, в кэш не попадает. Счётчик живёт только
+    до конца загрузки.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # pk: [число идущих загрузок, число вытеснений за время загрузок]
+        self.loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def end_load(self, pk, loading):
+        """Снимает отметку загрузки, вызывается под self.lock."""
+        loading[0] -= 1
+        if not loading[0]:
+            del self.loading[pk]
+
+    def get(self, pk):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(pk)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(pk)
+                self.hits += 1
+                registry.inc('yamdb_user_cache_hits_total', ())
+                # Копия: запрос не должен менять объект в кэше.
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+            loading = self.loading.setdefault(pk, [0, 0])
+            loading[0] += 1
+            version = loading[1]
+        registry.inc('yamdb_user_cache_misses_total', ())
+        try:
+            user = User.objects.get(pk=pk)
+        except BaseException:
+            with self.lock:
+                self.end_load(pk, loading)
+            raise
+        with self.lock:
+            self.end_load(pk, loading)
+            if loading[1] != version:
+                return user
+            self.entries[pk] = (copy.deepcopy(user),
+                                now + settings.USER_CACHE_TTL)
+            self.entries.move_to_end(pk)
+            while len(self.entries) > settings.USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return user
+
+    def evict(self, pk):
+        with self.lock:
+            self.entries.pop(pk, None)
+            if pk in self.loading:
+                self.loading[pk][1] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            for loading in self.loading.values():
+                loading[1] += 1
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    user_cache.evict(instance.pk)
+
+
+class ClaimsUser(TokenUser):
+    """
+    Пользователь, собранный из claims токена.
+
+    Отвечает на is_admin/is_moderator как модель User, а строку из БД
+    загружает только при вызове get_db_user().
+    """
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.role == ADMIN_ROLE
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR_ROLE
+
+    def get_db_user(self):
+        if not hasattr(self, '_db_user'):
+            self._db_user = user_cache.get(self.id)
+        return self._db_user
+
+
+def get_db_user(user):
+    """Модель User для текущего пользователя запроса."""
+    if isinstance(user, ClaimsUser):
+        return user.get_db_user()
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, берущая пользователя из user_cache."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+        try:
+            user = user_cache.get(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'),
+                                       code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'),
+                                       code='user_inactive')
+        return user
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к БД.
+
+    Claims токена учитываются только при STATELESS_JWT_AUTH; иначе
+    и для токенов без claim роли работает CachedJWTAuthentication.
+    Смена роли или блокировка пользователя вступают в силу только
+    с новым токеном.
+    """
+
+    def get_user(self, validated_token):
+        if (not settings.STATELESS_JWT_AUTH
+                or ROLE_CLAIM not in validated_token):
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
@@ -0,0 +1,216 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import bulk_data_changed
+
+GENERATION_KEY = 'catalog:generation:{}'
+RESPONSE_KEY = 'catalog:response:{}:{}'
+VERSIONED_MODELS = (Title, Genre, Category, Review, Comment, User)
+# Бэкенды, данные которых видны только текущему процессу.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def is_catalog_cache_enabled():
+    """
+    Включены ли кэш ответов и условный GET.
+
+    Поколения хранятся в кэше по умолчанию. В локальном для процесса
+    кэше запись в одном воркере не сдвигает поколение в остальных,
+    и они продолжают отдавать 304 и устаревшие ответы, поэтому
+    без явного CATALOG_CACHE_ENABLED нужен общий бэкенд.
+    """
+    enabled = settings.CATALOG_CACHE_ENABLED
+    if enabled is None:
+        return (settings.CACHES['default']['BACKEND']
+                not in LOCAL_CACHE_BACKENDS)
+    return enabled
+
+
+def get_generation(model):
+    """
+    Поколение модели — время последней записи в миллисекундах.
+
+    Значение только растёт, поэтому годится и как счётчик для ключей
+    кэша, и как отметка Last-Modified.
+    """
+    key = GENERATION_KEY.format(model._meta.label_lower)
+    generation = cache.get(key)
+    if generation is None:
+        # Вытесненный счётчик не должен вернуться к старому значению.
+        cache.add(key, _now_ms(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(model):
+    key = GENERATION_KEY.format(model._meta.label_lower)
+    generation = max(_now_ms(), (cache.get(key) or 0) + 1)
+    cache.set(key, generation, timeout=None)
+
+
+def bump_generation_on_commit(model):
+    """
+    Сдвигает поколение после коммита транзакции записи.
+
+    Иначе параллельный читатель может получить новое поколение,
+    ещё увидеть старые строки и закэшировать их под новым ключом.
+    """
+    transaction.on_commit(lambda: bump_generation(model))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_on_write(sender, instance, **kwargs):
+    if sender not in VERSIONED_MODELS:
+        return
+    # В ответах пользователь виден только как username автора, а код
+    # подтверждения сохраняется при каждой регистрации и входе.
+    if sender is User and (
+            kwargs.get('created')
+            or instance.username == getattr(
+                instance, '_loaded_username', None)):
+        return
+    bump_generation_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_on_title_genre_change(sender, **kwargs):
+    bump_generation_on_commit(Title)
+
+
+@receiver(bulk_data_changed)
+def bump_on_bulk_write(sender, models, **kwargs):
+    for model in models:
+        if model in VERSIONED_MODELS:
+            bump_generation_on_commit(model)
+
+
+class VersionedViewMixin:
+    """Поколения моделей `cache_models`, от которых зависит ответ."""
+    cache_models = ()
+
+    def get_generations(self):
+        if not hasattr(self, '_generations'):
+            self._generations = [
+                get_generation(model) for model in self.cache_models]
+        return self._generations
+
+
+class CachedResponseMixin(VersionedViewMixin):
+    """
+    Кэширует данные ответов на чтение для всех пользователей.
+
+    Ключ включает полный URL запроса со схемой и хостом (от них
+    зависят ссылки пагинации) и поколения моделей из `cache_models`,
+    поэтому запись в любую из них делает закэшированные страницы
+    недоступными.
+    """
+
+    def get_cache_key(self):
+        url = self.request.build_absolute_uri()
+        return RESPONSE_KEY.format(
+            ':'.join(map(str, self.get_generations())),
+            hashlib.md5(url.encode()).hexdigest()
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not is_catalog_cache_enabled():
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data,
+                      timeout=settings.CATALOG_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin(VersionedViewMixin):
+    """
+    ETag и Last-Modified для list/retrieve по поколениям моделей.
+
+    Валидаторы не требуют ни запросов к БД, ни сериализации. Перед
+    ответом 304 одним exists() проверяется, что объект или родитель
+    из URL существует (`conditional_targets`), иначе отдаётся 404.
+    """
+    # действие: (модель, {поле фильтра: параметр URL})
+    conditional_targets = {}
+
+    def conditional_target_exists(self):
+        target = self.conditional_targets.get(self.action)
+        if target is None:
+            return True
+        model, lookups = target
+        try:
+            return model.objects.filter(**{
+                field: self.kwargs[kwarg]
+                for field, kwarg in lookups.items()
+            }).exists()
+        except (TypeError, ValueError):
+            return False
+
+    def get_etag(self):
+        request = self.request
+        source = '|'.join((
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+            ':'.join(map(str, self.get_generations())),
+        ))
+        return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+    def get_last_modified(self):
+        return max(self.get_generations()) // 1000
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if not is_catalog_cache_enabled():
+            return handler(request, *args, **kwargs)
+        etag = self.get_etag()
+        last_modified = self.get_last_modified()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None or not self.conditional_target_exists():
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
@@ -1,6 +1,7 @@
 import django_filters
 
 from reviews import models as review_models
+from reviews.search import search_titles
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -16,7 +17,11 @@ class TitleFilter(django_filters.FilterSet):
         field_name='genre__slug',
         lookup_expr='exact'
     )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = review_models.Title
-        fields = ['name', 'category', 'genre', 'year']
+        fields = ['name', 'category', 'genre', 'year', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,194 @@
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from io import StringIO
+from itertools import count
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import (CaptureQueriesContext, override_settings,
+                               setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import user_cache
+from reviews.models import ADMIN_ROLE, Review, Title, User
+
+PERCENTILES = (50, 95, 99)
+
+
+class Command(BaseCommand):
+    help = ('Замер скорости эндпоинтов API на синтетических данных '
+            'в тестовой БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--reviews-per-title', type=float, default=10)
+        parser.add_argument('--comments-per-review', type=float, default=2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Количество замеров на каждый маршрут.')
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не очищать кэш ответов и кэш пользователей '
+                 'аутентификации между запросами.')
+        parser.add_argument(
+            '--route', action='append', dest='routes',
+            help='Замерить только указанные маршруты.')
+        parser.add_argument(
+            '--output', help='Файл для результатов в JSON.')
+
+    def seed(self, options):
+        call_command(
+            'generate_dataset',
+            users=options['users'],
+            titles=options['titles'],
+            reviews_per_title=options['reviews_per_title'],
+            comments_per_review=options['comments_per_review'],
+            seed=options['seed'],
+            stdout=StringIO(),
+        )
+        admin = User.objects.create(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role=ADMIN_ROLE, confirmation_code='123456')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}')
+        return admin, client
+
+    def get_routes(self, admin):
+        title = Title.objects.order_by('-rating_count').first()
+        review = Review.objects.filter(title=title).annotate(
+            comments_count=Count('comments')
+        ).order_by('-comments_count').first()
+        genre = title.genre.first()
+        titles = '/api/v1/titles/'
+        reviews = f'{titles}{title.pk}/reviews/'
+        comments = f'{reviews}{review.pk}/comments/'
+        signups = count()
+        # (имя, метод, путь, нужен ли токен, данные запроса)
+        return (
+            ('titles-list', 'get', titles, False, None),
+            ('titles-list-count-100', 'get', f'{titles}?count=100',
+             False, None),
+            ('titles-filter-genre', 'get',
+             f'{titles}?genre={genre.slug}', False, None),
+            ('titles-filter-category', 'get',
+             f'{titles}?category={title.category.slug}', False, None),
+            ('titles-filter-year', 'get', f'{titles}?year={title.year}',
+             False, None),
+            ('titles-filter-name', 'get',
+             f'{titles}?name={title.name.split()[0]}', False, None),
+            ('titles-search', 'get',
+             f'{titles}?search={title.name.split()[0]}', False, None),
+            ('titles-detail', 'get', f'{titles}{title.pk}/', False, None),
+            ('reviews-list', 'get', reviews, False, None),
+            ('reviews-list-deep-page', 'get',
+             f'{reviews}?page={max(1, title.rating_count // 5)}',
+             False, None),
+            ('reviews-detail', 'get', f'{reviews}{review.pk}/', False, None),
+            ('comments-list', 'get', comments, False, None),
+            ('comments-detail', 'get',
+             f'{comments}{review.comments.first().pk}/', False, None),
+            ('genres-list', 'get', '/api/v1/genres/', False, None),
+            ('categories-list', 'get', '/api/v1/categories/', False, None),
+            ('users-list', 'get', '/api/v1/users/', True, None),
+            ('users-detail', 'get', f'/api/v1/users/{admin.username}/',
+             True, None),
+            ('users-me', 'get', '/api/v1/users/me/', True, None),
+            ('auth-signup', 'post', '/api/v1/auth/signup/', False,
+             lambda: self.signup_data(next(signups))),
+            ('auth-token', 'post', '/api/v1/auth/token/', False,
+             lambda: {'username': admin.username,
+                      'confirmation_code': admin.confirmation_code}),
+        )
+
+    @staticmethod
+    def signup_data(number):
+        return {'username': f'bench{number}',
+                'email': f'bench{number}@yamdb.fake'}
+
+    def request(self, client, method, path, data):
+        if not self.warm:
+            cache.clear()
+            user_cache.clear()
+        if data is None:
+            return getattr(client, method)(path)
+        return getattr(client, method)(path, data=data())
+
+    def measure(self, client, method, path, data):
+        latencies = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            response = self.request(client, method, path, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+        # Счётчик запросов и tracemalloc искажают время, меряем отдельно.
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            self.request(client, method, path, data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        latencies.sort()
+        return {
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'iterations': self.iterations,
+            'mean_ms': round(statistics.mean(latencies), 3),
+            **{f'p{percentile}_ms': round(
+                self.percentile(latencies, percentile), 3)
+               for percentile in PERCENTILES},
+            'queries': len(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    @staticmethod
+    def percentile(values, percentile):
+        index = round(percentile / 100 * (len(values) - 1))
+        return values[index]
+
+    def handle(self, *args, **options):
+        self.iterations = options['iterations']
+        self.warm = options['warm']
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        # Замер идёт в одном процессе, локальный кэш ответов здесь общий.
+        catalog_cache = override_settings(CATALOG_CACHE_ENABLED=True)
+        catalog_cache.enable()
+        try:
+            admin, admin_client = self.seed(options)
+            results = {}
+            for name, method, path, auth, data in self.get_routes(admin):
+                if options['routes'] and name not in options['routes']:
+                    continue
+                client = admin_client if auth else APIClient()
+                results[name] = self.measure(client, method, path, data)
+                self.stderr.write(
+                    f'{name}: p50 {results[name]["p50_ms"]} мс, '
+                    f'p95 {results[name]["p95_ms"]} мс, '
+                    f'запросов {results[name]["queries"]}')
+        finally:
+            catalog_cache.disable()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = json.dumps({
+            'dataset': {key: options[key] for key in (
+                'users', 'titles', 'reviews_per_title',
+                'comments_per_review', 'seed')},
+            'warm_cache': self.warm,
+            'routes': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            sys.stdout.write(report + '\n')
@@ -0,0 +1,137 @@
+import json
+import statistics
+import sys
+import time
+from functools import partial
+from io import BytesIO, StringIO
+from itertools import chain
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import TitleRowSerializer, TitleSerializer
+from api.views import TitleViewSet
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = ('Сравнение TitleSerializer с TitleRowSerializer и JSONRenderer '
+            'с FastJSONRenderer на больших страницах произведений '
+            'в тестовой БД.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument(
+            '--page-size', type=int, action='append', dest='page_sizes',
+            help='Размер страницы, можно указать несколько раз '
+                 '(по умолчанию 100 и 1000).')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Файл для результатов в JSON.')
+
+    @staticmethod
+    def model_serializer(page_size):
+        titles = Title.objects.select_related(
+            'category').prefetch_related('genre')[:page_size]
+        return TitleSerializer(titles, many=True).data
+
+    @staticmethod
+    def row_serializer(page_size):
+        fields = dict.fromkeys(chain(
+            TitleViewSet.sparse_required_fields,
+            *TitleViewSet.sparse_model_fields.values()))
+        rows = Title.objects.values(*fields)[:page_size]
+        return TitleRowSerializer(rows, many=True).data
+
+    @staticmethod
+    def render(renderer, data):
+        return renderer.render(data, 'application/json')
+
+    @staticmethod
+    def parse(parser, body):
+        return parser.parse(BytesIO(body))
+
+    def compare_json(self, page_size):
+        data = self.model_serializer(page_size)
+        body = JSONRenderer().render(data)
+        return {
+            'bytes': len(body),
+            'render': {
+                'json_renderer': self.measure(
+                    partial(self.render, JSONRenderer()), data),
+                'fast_json_renderer': self.measure(
+                    partial(self.render, FastJSONRenderer()), data),
+            },
+            'parse': {
+                'json_parser': self.measure(
+                    partial(self.parse, JSONParser()), body),
+                'fast_json_parser': self.measure(
+                    partial(self.parse, FastJSONParser()), body),
+            },
+        }
+
+    def measure(self, func, argument):
+        timings = []
+        for _ in range(self.iterations):
+            started = time.perf_counter()
+            func(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'mean_ms': round(statistics.mean(timings), 3),
+            'median_ms': round(statistics.median(timings), 3),
+        }
+
+    def handle(self, *args, **options):
+        self.iterations = options['iterations']
+        page_sizes = options['page_sizes'] or (100, 1000)
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            call_command(
+                'generate_dataset', users=100, titles=options['titles'],
+                reviews_per_title=1, comments_per_review=0,
+                seed=options['seed'], stdout=StringIO())
+            results = {}
+            for page_size in page_sizes:
+                model = self.measure(self.model_serializer, page_size)
+                rows = self.measure(self.row_serializer, page_size)
+                json_results = self.compare_json(page_size)
+                results[page_size] = {
+                    'model_serializer': model,
+                    'row_serializer': rows,
+                    'speedup': round(
+                        model['median_ms'] / rows['median_ms'], 2),
+                    'json': json_results,
+                }
+                render = json_results['render']
+                self.stderr.write(
+                    f'{page_size} произведений: ModelSerializer '
+                    f'{model["median_ms"]} мс, values() '
+                    f'{rows["median_ms"]} мс, '
+                    f'ускорение x{results[page_size]["speedup"]}; '
+                    f'JSONRenderer '
+                    f'{render["json_renderer"]["median_ms"]} мс, '
+                    f'FastJSONRenderer '
+                    f'{render["fast_json_renderer"]["median_ms"]} мс')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        report = json.dumps({
+            'titles': options['titles'],
+            'iterations': self.iterations,
+            'json_backend': 'json' if orjson is None else 'orjson',
+            'page_sizes': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+        else:
+            sys.stdout.write(report + '\n')
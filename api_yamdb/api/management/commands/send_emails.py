@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.outbox import claim_due, deliver, prune_outbox
+
+# Как часто воркер удаляет старые письма, в секундах.
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Отправка писем из очереди OutgoingEmail.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь один раз и выйти.')
+
+    def handle(self, *args, **options):
+        pruned_at = None
+        while True:
+            messages = claim_due(options['batch_size'])
+            sent, retried, failed = deliver(messages)
+            if messages:
+                self.stdout.write(
+                    f'Отправлено: {len(sent)}, отложено: {len(retried)}, '
+                    f'не отправлено: {len(failed)}'
+                )
+            if len(messages) == options['batch_size']:
+                continue
+            if (pruned_at is None
+                    or time.monotonic() - pruned_at >= PRUNE_INTERVAL):
+                pruned = prune_outbox()
+                pruned_at = time.monotonic()
+                if pruned:
+                    self.stdout.write(f'Удалено старых писем: {pruned}')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,255 @@
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000)
+# Письмо ждёт в очереди от секунд до часов, если SMTP недоступен.
+EMAIL_DELIVERY_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 1800, 3600, 7200)
+
+HTTP_LABELS = ('route', 'method')
+
+# имя метрики: (тип, описание, границы корзин гистограммы, метки)
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Количество запросов.', None, HTTP_LABELS),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса.', LATENCY_BUCKETS,
+        HTTP_LABELS),
+    'yamdb_db_queries_per_request': (
+        'histogram', 'SQL-запросов на запрос.', QUERY_COUNT_BUCKETS,
+        HTTP_LABELS),
+    'yamdb_db_duration_seconds': (
+        'histogram', 'Время SQL-запросов на запрос.', LATENCY_BUCKETS,
+        HTTP_LABELS),
+    'yamdb_http_response_size_bytes': (
+        'histogram', 'Размер тела ответа.', SIZE_BUCKETS, HTTP_LABELS),
+    'yamdb_user_cache_hits_total': (
+        'counter', 'Пользователь найден в кэше аутентификации.', None, ()),
+    'yamdb_user_cache_misses_total': (
+        'counter', 'Пользователь загружен из БД при аутентификации.', None,
+        ()),
+    'yamdb_emails_sent_total': (
+        'counter', 'Отправлено писем из очереди.', None, ()),
+    'yamdb_email_send_errors_total': (
+        'counter', 'Неудачных попыток отправки письма.', None, ()),
+    'yamdb_email_delivery_seconds': (
+        'histogram', 'Время от постановки письма в очередь до отправки.',
+        EMAIL_DELIVERY_BUCKETS, ()),
+    'yamdb_email_queue_depth': (
+        'gauge', 'Писем в очереди на отправку.', None, ()),
+    'yamdb_email_oldest_pending_seconds': (
+        'gauge', 'Возраст самого старого письма в очереди.', None, ()),
+}
+UNKNOWN_ROUTE = 'unknown'
+FLUSH_INTERVAL = 1
+
+logger = logging.getLogger('api.metrics')
+
+
+class Registry:
+    """
+    Потокобезопасные счётчики и гистограммы текущего процесса.
+
+    Если задан METRICS_MULTIPROCESS_DIR, процесс не реже раза
+    в FLUSH_INTERVAL секунд сохраняет снимок в свой файл, а экспорт
+    суммирует файлы всех процессов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Отдельная блокировка: снимок берёт self.lock внутри flush.
+        self.flush_lock = threading.Lock()
+        self.values = defaultdict(dict)
+        self.flushed_at = 0
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            series = self.values[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        with self.lock:
+            series = self.values[name].setdefault(
+                labels, {'buckets': [0] * len(buckets), 'sum': 0,
+                         'count': 0})
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [[list(labels), copy.deepcopy(value)]
+                       for labels, value in series.items()]
+                for name, series in self.values.items()
+            }
+
+    def get_dir(self):
+        return getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+    def flush(self, force=False):
+        """
+        Сохраняет снимок процесса в METRICS_MULTIPROCESS_DIR.
+
+        Пишет один поток за раз; плановый сброс пропускается, если
+        другой поток уже пишет. Ошибки записи только логируются,
+        чтобы не ронять запрос пользователя.
+        """
+        directory = self.get_dir()
+        if directory is None:
+            return
+        if not self.flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self.flushed_at < FLUSH_INTERVAL:
+                return
+            self.flushed_at = now
+            path = os.path.join(directory, f'{os.getpid()}.json')
+            with open(f'{path}.tmp', 'w') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(f'{path}.tmp', path)
+        except OSError:
+            logger.exception('Не удалось сохранить снимок метрик')
+        finally:
+            self.flush_lock.release()
+
+    def collect(self):
+        """Снимки всех процессов, суммированные по меткам."""
+        directory = self.get_dir()
+        if directory is None:
+            return self.snapshot()
+        self.flush(force=True)
+        merged = defaultdict(dict)
+        for file_name in os.listdir(directory):
+            if not file_name.endswith('.json'):
+                continue
+            with open(os.path.join(directory, file_name)) as file:
+                snapshot = json.load(file)
+            for name, series in snapshot.items():
+                for labels, value in series:
+                    merge(merged[name], tuple(labels), value)
+        return {name: [[list(labels), value]
+                       for labels, value in series.items()]
+                for name, series in merged.items()}
+
+
+def merge(series, labels, value):
+    current = series.get(labels)
+    if current is None:
+        series[labels] = value
+    elif isinstance(value, dict):
+        current['buckets'] = [
+            a + b for a, b in zip(current['buckets'], value['buckets'])]
+        current['sum'] += value['sum']
+        current['count'] += value['count']
+    else:
+        series[labels] = current + value
+
+
+registry = Registry()
+
+
+def format_labels(names, values, **extra):
+    labels = {**dict(zip(names, values)), **extra}
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"'))
+        for key, value in labels.items()
+    ) + '}'
+
+
+def render_metrics(gauges=None):
+    """
+    Метрики в текстовом формате Prometheus.
+
+    Значения gauge не копятся в реестре, их считают при экспорте
+    и передают в gauges.
+    """
+    collected = registry.collect()
+    gauges = gauges or {}
+    lines = []
+    for name, (kind, description, buckets, names) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'gauge':
+            if name in gauges:
+                lines.append(f'{name} {gauges[name]}')
+            continue
+        for labels, value in sorted(
+                (tuple(labels), value)
+                for labels, value in collected.get(name, [])):
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(names, labels)} {value}')
+                continue
+            for bound, count in zip(buckets, value['buckets']):
+                lines.append(f'{name}_bucket'
+                             f'{format_labels(names, labels, le=bound)} '
+                             f'{count}')
+            lines.append(f'{name}_bucket'
+                         f'{format_labels(names, labels, le="+Inf")} '
+                         f'{value["count"]}')
+            lines.append(f'{name}_sum{format_labels(names, labels)} '
+                         f'{value["sum"]}')
+            lines.append(f'{name}_count{format_labels(names, labels)} '
+                         f'{value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """Считает количество и время SQL-запросов через execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Собирает метрики по имени маршрута и HTTP-методу."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        labels = (match.view_name if match else UNKNOWN_ROUTE,
+                  request.method)
+        registry.inc('yamdb_http_requests_total', labels)
+        registry.observe('yamdb_http_request_duration_seconds', labels,
+                         duration)
+        registry.observe('yamdb_db_queries_per_request', labels,
+                         timer.count)
+        registry.observe('yamdb_db_duration_seconds', labels,
+                         timer.duration)
+        if not response.streaming:
+            registry.observe('yamdb_http_response_size_bytes', labels,
+                             len(response.content))
+        registry.flush()
+        return response
@@ -0,0 +1,43 @@
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger('api.query_budget')
+
+
+def get_query_budget(view_cls, action):
+    """Допустимое число SQL-запросов для действия viewset или None."""
+    return getattr(view_cls, 'query_budget', {}).get(action)
+
+
+class QueryBudgetMiddleware:
+    """
+    Логирует запросы, превысившие `query_budget` своего действия.
+
+    Для разработки: включается настройкой QUERY_BUDGET_LOGGING.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_LOGGING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_cls = getattr(match and match.func, 'cls', None)
+        actions = getattr(match and match.func, 'actions', None)
+        if view_cls is None or not actions:
+            return response
+        action = actions.get(request.method.lower())
+        budget = get_query_budget(view_cls, action)
+        if budget is not None and len(queries) > budget:
+            logger.warning(
+                '%s %s (%s.%s): %d SQL-запросов при бюджете %d',
+                request.method, request.path, view_cls.__name__,
+                action, len(queries), budget)
+        return response
@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+from .metrics import registry
+
+
+def enqueue_email(subject, body, from_email, recipients):
+    """Ставит письмо в очередь; в режиме EMAIL_OUTBOX_EAGER сразу шлёт."""
+    message = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipients='\n'.join(recipients),
+        next_attempt_at=timezone.now(),
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        deliver([message])
+    return message
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_BASE * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_RETRY_MAX))
+
+
+def claim_due(batch_size):
+    """
+    Забирает пачку писем, которым пора отправляться.
+
+    Время следующей попытки сдвигается на EMAIL_OUTBOX_LEASE, чтобы
+    письма не взял второй воркер. Где СУБД поддерживает SKIP LOCKED,
+    воркеры не ждут друг друга; в SQLite запускайте один воркер.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        messages = list(due[:batch_size])
+        OutgoingEmail.objects.filter(
+            pk__in=[message.pk for message in messages]
+        ).update(next_attempt_at=now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_LEASE))
+    return messages
+
+
+def fail_attempt(message, error, retried, failed):
+    """Неудачная попытка: повтор с задержкой или отказ после лимита."""
+    registry.inc('yamdb_email_send_errors_total', ())
+    message.last_error = str(error)
+    if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = OutgoingEmail.FAILED
+        message.body = ''
+        failed.append(message)
+    else:
+        message.next_attempt_at = (
+            timezone.now() + get_retry_delay(message.attempts))
+        retried.append(message)
+
+
+def deliver(messages):
+    """
+    Отправляет письма через одно SMTP-соединение.
+
+    Если соединение не открылось, попытка засчитывается неудачной
+    для всей пачки. У отправленных и отбракованных писем текст
+    стирается: в нём код подтверждения. Возвращает списки
+    отправленных, отложенных и отбракованных писем.
+    """
+    sent, retried, failed = [], [], []
+    if not messages:
+        return sent, retried, failed
+    for message in messages:
+        message.attempts += 1
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for message in messages:
+            fail_attempt(message, error, retried, failed)
+    else:
+        try:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject, message.body, message.from_email,
+                        message.recipients.split('\n'),
+                        connection=mail_connection,
+                    ).send()
+                except Exception as error:
+                    fail_attempt(message, error, retried, failed)
+                    continue
+                message.status = OutgoingEmail.SENT
+                message.sent_at = timezone.now()
+                message.body = ''
+                registry.inc('yamdb_emails_sent_total', ())
+                registry.observe(
+                    'yamdb_email_delivery_seconds', (),
+                    (message.sent_at - message.created_at).total_seconds())
+                sent.append(message)
+        finally:
+            mail_connection.close()
+    OutgoingEmail.objects.bulk_update(
+        messages,
+        ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at',
+         'body'])
+    registry.flush()
+    return sent, retried, failed
+
+
+def prune_outbox():
+    """
+    Удаляет отправленные и отбракованные письма старше
+    EMAIL_OUTBOX_RETENTION секунд. Возвращает число удалённых писем.
+    """
+    if settings.EMAIL_OUTBOX_RETENTION is None:
+        return 0
+    border = timezone.now() - timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETENTION)
+    # У отбракованного письма next_attempt_at — время последней попытки.
+    deleted, _ = OutgoingEmail.objects.filter(
+        Q(status=OutgoingEmail.SENT, sent_at__lt=border)
+        | Q(status=OutgoingEmail.FAILED, next_attempt_at__lt=border)
+    ).delete()
+    return deleted
+
+
+def get_queue_gauges():
+    """Глубина очереди и возраст самого старого неотправленного письма."""
+    pending = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING)
+    oldest = pending.order_by('created_at').values_list(
+        'created_at', flat=True).first()
+    return {
+        'yamdb_email_queue_depth': pending.count(),
+        'yamdb_email_oldest_pending_seconds': (
+            (timezone.now() - oldest).total_seconds() if oldest else 0),
+    }
@@ -1,7 +1,64 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+CURSOR_QUERY_PARAM = 'cursor'
+PAGINATION_QUERY_PARAM = 'pagination'
+CURSOR_PAGINATION = 'cursor'
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'count'
     max_page_size = 1000
+
+
+class CursorResultsSetPagination(CursorPagination):
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET."""
+    cursor_query_param = CURSOR_QUERY_PARAM
+    page_size = 5
+    page_size_query_param = 'count'
+    max_page_size = 1000
+    ordering = ('pub_date', 'id')
+
+
+class TitleCursorPagination(CursorResultsSetPagination):
+    ordering = ('name', 'id')
+
+
+class OptionalCursorPagination(StandardResultsSetPagination):
+    """
+    Постраничная пагинация с переключением на keyset по запросу клиента.
+
+    Курсорный режим включается параметром `?pagination=cursor`
+    или наличием `?cursor=` в запросе.
+    """
+    cursor_pagination_class = CursorResultsSetPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def is_cursor_requested(self, request):
+        return (
+            request.query_params.get(PAGINATION_QUERY_PARAM)
+            == CURSOR_PAGINATION
+            or CURSOR_QUERY_PARAM in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_requested(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ReviewCommentPagination(OptionalCursorPagination):
+    cursor_pagination_class = CursorResultsSetPagination
+
+
+class TitlePagination(OptionalCursorPagination):
+    cursor_pagination_class = TitleCursorPagination
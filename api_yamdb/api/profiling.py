@@ -0,0 +1,75 @@
+import cProfile
+import io
+import os
+import pstats
+import uuid
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .authentication import StatelessJWTAuthentication
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = 'profile'
+SUMMARY_MODE = 'summary'
+DUMP_MODE = 'dump'
+TOP_FUNCTIONS = 40
+
+
+def get_profile_path(profile_id):
+    return os.path.join(settings.PROFILING_DIR, f'{profile_id}.prof')
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование запроса администратора через cProfile.
+
+    Запускается заголовком `X-Profile` или параметром `?profile=`.
+    Режим `summary` заменяет тело ответа топом функций по
+    cumulative-времени, режим `dump` сохраняет .prof файл и отдаёт
+    его id в заголовке `X-Profile-Id`. Остальные запросы проходят
+    после одной проверки заголовка и параметра.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = (request.META.get(PROFILE_HEADER)
+                or request.GET.get(PROFILE_QUERY_PARAM))
+        if not mode or not self.is_admin(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        if mode == DUMP_MODE:
+            return self.dump(profiler, response)
+        return self.summary(profiler, response)
+
+    def is_admin(self, request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            try:
+                auth = StatelessJWTAuthentication().authenticate(request)
+            except (AuthenticationFailed, InvalidToken):
+                return False
+            user = auth[0] if auth else None
+        return user is not None and user.is_admin
+
+    def summary(self, profiler, response):
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+            TOP_FUNCTIONS)
+        summary = HttpResponse(stream.getvalue(),
+                               content_type='text/plain; charset=utf-8')
+        summary['X-Profiled-Status'] = response.status_code
+        return summary
+
+    def dump(self, profiler, response):
+        profile_id = uuid.uuid4().hex
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        profiler.dump_stats(get_profile_path(profile_id))
+        response['X-Profile-Id'] = profile_id
+        return response
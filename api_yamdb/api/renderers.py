@@ -0,0 +1,58 @@
+import decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Даты и dataclass отдаём encoder_class DRF, чтобы формат совпадал.
+    ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME
+                      | orjson.OPT_PASSTHROUGH_DATACLASS
+                      | orjson.OPT_NON_STR_KEYS)
+
+
+def contains_float(data):
+    """Есть ли в данных float или Decimal, в том числе в ключах."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (float, decimal.Decimal)):
+            return True
+        if isinstance(value, dict):
+            stack.extend(value.items())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен.
+
+    Ответ совпадает с JSONRenderer побайтно: даты и ленивые строки
+    кодирует encoder_class DRF. Отступы, ensure_ascii и значения,
+    которые orjson кодирует иначе или не умеет, рендерятся стандартным
+    json: числа с плавающей точкой (формат экспоненты, NaN и Infinity
+    при STRICT_JSON) и целые больше 64 бит.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None
+                or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None
+                or contains_float(data)):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        # Как и JSONRenderer, экранируем U+2028 и U+2029 для JavaScript.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace(
+            '\u2029'.encode(), b'\\u2029')
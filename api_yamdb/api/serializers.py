@@ -1,12 +1,14 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
 
 from reviews import models as review_models
 from reviews.validators import username_validator, validate_year_title
 
+from .sparse_fields import SparseFieldsSerializerMixin, get_sparse_fields
 
-class ReviewSerializer(serializers.ModelSerializer):
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -29,19 +31,9 @@ class ReviewSerializer(serializers.ModelSerializer):
             'pub_date'
         )
 
-    def validate(self, attrs):
-        if self.context['request'].method != 'POST':
-            return attrs
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(review_models.Title, pk=title_id)
-        if title.reviews.filter(
-                author=self.context['request'].user).exists():
-            raise serializers.ValidationError(
-                'Можно оставить только 1 отзыв.')
-        return attrs
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -69,10 +61,11 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = review_models.Title
@@ -83,6 +76,60 @@ class TitleSerializer(serializers.ModelSerializer):
         read_only_fields = ('__all__',)
 
 
+class TitleRowSerializer:
+    """
+    Быстрое чтение произведений из строк values() без ModelSerializer.
+
+    Ответ совпадает с TitleSerializer. Категория приходит в строке
+    join'ом (поля category, category__slug, category__name),
+    жанры страницы загружаются одним запросом по связующей таблице.
+    """
+    related_fields = ('slug', 'name')
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.fields = get_sparse_fields(self.context.get('request'),
+                                        TitleSerializer.Meta.fields)
+
+    def get_genres(self, rows):
+        genres = {row['id']: [] for row in rows}
+        through = review_models.Title.genre.through.objects.filter(
+            title_id__in=genres
+        ).order_by(
+            *(f'genre__{field}'
+              for field in review_models.Genre._meta.ordering)
+        ).values_list(
+            'title_id',
+            *(f'genre__{field}' for field in self.related_fields)
+        )
+        for title_id, *values in through:
+            genres[title_id].append(dict(zip(self.related_fields, values)))
+        return genres
+
+    def to_representation(self, row, genres):
+        data = {}
+        for name in self.fields:
+            if name == 'genre':
+                data[name] = genres[row['id']]
+            elif name == 'category':
+                data[name] = row['category'] and {
+                    field: row[f'category__{field}']
+                    for field in self.related_fields
+                }
+            else:
+                data[name] = row[name]
+        return data
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        genres = self.get_genres(rows) if 'genre' in self.fields else None
+        result = [self.to_representation(row, genres) for row in rows]
+        return result if self.many else result[0]
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         slug_field='slug',
@@ -120,7 +167,8 @@ class LoginSerializer(serializers.Serializer):
     )
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     """User serializer"""
 
     class Meta:
@@ -0,0 +1,83 @@
+import logging
+import os
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('api.slow_query')
+
+# Кадры инструментирования не показывают, откуда пришёл запрос.
+INSTRUMENTATION_MODULES = ('metrics', 'middleware', 'profiling',
+                           'slow_query', 'timing')
+
+
+class SlowQueryLogger:
+    """
+    Логирует SQL-запросы дольше SLOW_QUERY_THRESHOLD_MS.
+
+    В запись попадают SQL, параметры, длительность, ближайший кадр
+    кода проекта (view, сериализатор) и для SQLite — EXPLAIN QUERY PLAN.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.local = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self.local, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            threshold = settings.SLOW_QUERY_THRESHOLD_MS
+            if threshold is not None and duration >= threshold:
+                self.log(sql, params, many, duration)
+
+    def log(self, sql, params, many, duration):
+        logger.warning(
+            'Медленный SQL-запрос %.1f мс\n%s\nпараметры: %r\n'
+            'вызван из: %s\nплан:\n%s',
+            duration, sql, params, self.get_caller(),
+            self.explain(sql, params, many))
+
+    def get_caller(self):
+        """Ближайший к запросу кадр стека из кода проекта."""
+        base_dir = settings.BASE_DIR + os.sep
+        skipped = {
+            os.path.join(os.path.dirname(__file__), f'{module}.py')
+            for module in INSTRUMENTATION_MODULES
+        }
+        for frame in reversed(traceback.extract_stack()):
+            if (frame.filename.startswith(base_dir)
+                    and frame.filename not in skipped):
+                return f'{frame.filename}:{frame.lineno} в {frame.name}'
+        return 'вне кода проекта'
+
+    def explain(self, sql, params, many):
+        if (self.connection.vendor != 'sqlite' or many
+                or not sql.lstrip().upper().startswith('SELECT')):
+            return '-'
+        self.local.explaining = True
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                return '\n'.join(f'  {row[-1]}' for row in cursor.fetchall())
+        except Exception as error:
+            return f'  не удалось получить план: {error}'
+        finally:
+            self.local.explaining = False
+
+
+@receiver(connection_created)
+def install_slow_query_logger(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_THRESHOLD_MS is None:
+        return
+    if not any(isinstance(wrapper, SlowQueryLogger)
+               for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryLogger(connection))
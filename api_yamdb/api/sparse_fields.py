@@ -0,0 +1,74 @@
+from itertools import chain
+
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def parse_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request, available):
+    """
+    Поля из available, оставленные параметрами `?fields=` и `?omit=`.
+
+    Неизвестные имена игнорируются. Запросы на запись всегда
+    получают все поля.
+    """
+    available = list(available)
+    if request is None or request.method not in SAFE_METHODS:
+        return available
+    fields = request.query_params.get(FIELDS_QUERY_PARAM)
+    if fields:
+        wanted = parse_field_names(fields)
+        available = [name for name in available if name in wanted]
+    omit = request.query_params.get(OMIT_QUERY_PARAM)
+    if omit:
+        unwanted = parse_field_names(omit)
+        available = [name for name in available if name not in unwanted]
+    return available
+
+
+class SparseFieldsSerializerMixin:
+    """Убирает из сериализатора поля, не запрошенные в `?fields=`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        keep = set(get_sparse_fields(self.context.get('request'),
+                                     self.fields))
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+
+class SparseFieldsViewMixin:
+    """
+    Сужает запрос к БД до полей, запрошенных в `?fields=` и `?omit=`.
+
+    `sparse_model_fields` сопоставляет поле сериализатора и поля
+    модели для only(); `sparse_required_fields` загружаются всегда,
+    например поля сортировки курсорной пагинации.
+    """
+    sparse_model_fields = {}
+    sparse_required_fields = ()
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = set(get_sparse_fields(
+                self.request, self.sparse_model_fields))
+        return self._sparse_fields
+
+    def get_sparse_model_fields(self):
+        fields = self.get_sparse_fields()
+        return list(dict.fromkeys(chain(
+            self.sparse_required_fields,
+            *(self.sparse_model_fields[name]
+              for name in self.sparse_model_fields if name in fields)
+        )))
+
+    def apply_sparse_fields(self, queryset):
+        if len(self.get_sparse_fields()) == len(self.sparse_model_fields):
+            return queryset
+        return queryset.only(*self.get_sparse_model_fields())
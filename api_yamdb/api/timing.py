@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.response import Response
+
+from .metrics import QueryTimer
+
+
+class RequestTiming:
+    """Длительность фаз обработки одного запроса, в секундах."""
+
+    def __init__(self):
+        self.queries = QueryTimer()
+        self.serialize = 0
+        self.render = 0
+        self.serialize_started = None
+        self.serialize_db_started = 0
+
+    def start_serialize(self):
+        if self.serialize_started is None:
+            self.serialize_started = time.perf_counter()
+            self.serialize_db_started = self.queries.duration
+
+    def finish_serialize(self):
+        if self.serialize_started is None:
+            return
+        # Запросы ленивых queryset внутри сериализатора относим к db.
+        db = self.queries.duration - self.serialize_db_started
+        self.serialize += (
+            time.perf_counter() - self.serialize_started - db)
+        self.serialize_started = None
+
+    def header(self, total):
+        phases = (
+            ('db', self.queries.duration,
+             f'queries={self.queries.count}'),
+            ('serialize', self.serialize, None),
+            ('render', self.render, None),
+            ('total', total, None),
+        )
+        return ', '.join(
+            f'{name};dur={duration * 1000:.2f}'
+            + (f';desc="{description}"' if description else '')
+            for name, duration, description in phases
+        )
+
+
+class ServerTimingMiddleware:
+    """
+    Добавляет к ответам заголовок Server-Timing.
+
+    Включается настройкой SERVER_TIMING. Фазы serialize и render
+    заполняет ServerTimingMixin у viewset.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.server_timing = RequestTiming()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timing.queries):
+            response = self.get_response(request)
+        response['Server-Timing'] = timing.header(
+            time.perf_counter() - started)
+        return response
+
+
+class ServerTimingMixin:
+    """Замеряет работу сериализаторов и рендеринг ответа viewset."""
+
+    def get_timing(self):
+        return getattr(self.request, 'server_timing', None)
+
+    def get_serializer(self, *args, **kwargs):
+        timing = self.get_timing()
+        if timing is not None:
+            timing.start_serialize()
+        return super().get_serializer(*args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        timing = self.get_timing()
+        if timing is None or not isinstance(response, Response):
+            return response
+        timing.finish_serialize()
+        started = time.perf_counter()
+        response.render()
+        timing.render += time.perf_counter() - started
+        return response
@@ -1,4 +1,4 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework import routers
 
 from . import views
@@ -36,6 +36,9 @@ auth_urls = [
 ]
 
 urlpatterns = [
+    path('v1/metrics/', views.MetricsView.as_view(), name='metrics'),
+    re_path(r'^v1/profiles/(?P<profile_id>[0-9a-f]{32})/$',
+            views.ProfileDownloadView.as_view(), name='profiles'),
     path('v1/', include(router_v1.urls)),
     path('v1/', include(auth_urls))
 ]
@@ -1,25 +1,36 @@
+import os
 from random import randint
 
 from django.conf import settings
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import (SAFE_METHODS, AllowAny,
+                                        IsAuthenticated)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from reviews.models import (Review, Title, Genre, Category, User,
+from reviews.models import (Comment, Review, Title, Genre, Category, User,
                             START_RANGE_CONFIRMATION_CODE,
                             END_RANGE_CONFIRMATION_CODE,
                             NOT_PIN_CONFIRMATION_CODE)
 
 from . import paginators, permissions, serializers
+from .authentication import get_access_token, get_db_user
+from .cache import (CachedListMixin, CachedRetrieveMixin,
+                    ConditionalGetMixin)
 from .filters import TitleFilter
+from .metrics import render_metrics
+from .outbox import enqueue_email, get_queue_gauges
+from .profiling import get_profile_path
+from .sparse_fields import SparseFieldsViewMixin
+from .timing import ServerTimingMixin
 
 
 def set_confirmation_code(user):
@@ -28,7 +39,24 @@ def set_confirmation_code(user):
     user.save()
 
 
-class BaseGenreCategoryViewSet(mixins.ListModelMixin,
+def is_unique_author_title_error(error):
+    """
+    IntegrityError нарушает ограничение unique_author_title.
+
+    PostgreSQL называет ограничение по имени, SQLite перечисляет
+    столбцы таблицы.
+    """
+    message = str(error)
+    table = Review._meta.db_table
+    columns = ', '.join(
+        f'{table}.{Review._meta.get_field(name).column}'
+        for name in ('author', 'title'))
+    return 'unique_author_title' in message or columns in message
+
+
+class BaseGenreCategoryViewSet(ServerTimingMixin,
+                               CachedListMixin,
+                               mixins.ListModelMixin,
                                mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
@@ -37,70 +65,168 @@ class BaseGenreCategoryViewSet(mixins.ListModelMixin,
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=name',)
     pagination_class = paginators.StandardResultsSetPagination
+    # Бюджеты SQL-запросов не зависят от размера страницы и включают
+    # загрузку пользователя при аутентификации.
+    query_budget = {'list': 3}
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ServerTimingMixin, ConditionalGetMixin,
+                    SparseFieldsViewMixin, viewsets.ModelViewSet):
     """Endpoint модели Review."""
+    cache_models = (Title, Review, User)
+    conditional_targets = {
+        'list': (Title, {'pk': 'title_id'}),
+        'retrieve': (Review, {'pk': 'pk', 'title__pk': 'title_id'}),
+    }
+    query_budget = {'list': 4, 'retrieve': 3}
     serializer_class = serializers.ReviewSerializer
     permission_classes = (
         permissions.OnlyContributionAdminModeratorOrRead,)
-    pagination_class = paginators.StandardResultsSetPagination
-
-    def get_title(self):
-        return get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id')
-        )
+    pagination_class = paginators.ReviewCommentPagination
+    sparse_model_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+    # title нужен менеджеру title.reviews, pub_date - курсору.
+    sparse_required_fields = ('title', 'pub_date')
+
+    @cached_property
+    def title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        queryset = self.title.reviews.all()
+        if 'author' in self.get_sparse_fields():
+            queryset = queryset.select_related('author')
+        return self.apply_sparse_fields(queryset)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        try:
+            serializer.save(author=get_db_user(self.request.user),
+                            title=self.title)
+        except IntegrityError as error:
+            # Повторный отзыв отсекает ограничение unique_author_title,
+            # остальные ошибки целостности не про дубликат.
+            if not is_unique_author_title_error(error):
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Можно оставить только 1 отзыв.']})
+
+
+class CommentViewSet(ServerTimingMixin, ConditionalGetMixin,
+                     SparseFieldsViewMixin, viewsets.ModelViewSet):
     """Endpoint модели Comment."""
+    cache_models = (Review, Comment, User)
+    conditional_targets = {
+        'list': (Review, {'pk': 'review_id', 'title__pk': 'title_id'}),
+        'retrieve': (Comment, {'pk': 'pk', 'review__pk': 'review_id',
+                               'review__title__pk': 'title_id'}),
+    }
+    query_budget = {'list': 3, 'retrieve': 3}
     serializer_class = serializers.CommentSerializer
     permission_classes = (
         permissions.OnlyContributionAdminModeratorOrRead,)
-    pagination_class = paginators.StandardResultsSetPagination
-
-    def get_review(self):
+    pagination_class = paginators.ReviewCommentPagination
+    sparse_model_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+    sparse_required_fields = ('review', 'pub_date')
+
+    @cached_property
+    def review(self):
+        """Отзыв из URL, загружается один раз за запрос."""
         return get_object_or_404(Review,
                                  pk=self.kwargs['review_id'],
                                  title__pk=self.kwargs['title_id'])
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        if self.action == 'list':
+            # Пара (title_id, review_id) проверяется join'ом в том же
+            # запросе, отзыв отдельно не загружается.
+            queryset = Comment.objects.filter(
+                review__pk=self.kwargs['review_id'],
+                review__title__pk=self.kwargs['title_id'],
+            )
+        else:
+            queryset = self.review.comments.all()
+        if 'author' in self.get_sparse_fields():
+            queryset = queryset.select_related('author')
+        return self.apply_sparse_fields(queryset)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not Review.objects.filter(
+                pk=self.kwargs['review_id'],
+                title__pk=self.kwargs['title_id']).exists():
+            raise Http404
+        return page
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=get_db_user(self.request.user),
+                        review=self.review)
 
 
 class CategoryViewSet(BaseGenreCategoryViewSet):
     """Endpoint модели Category."""
     queryset = Category.objects.all()
+    cache_models = (Category,)
     serializer_class = serializers.CategorySerializer
 
 
 class GenreViewSet(BaseGenreCategoryViewSet):
     """Endpoint модели Genre."""
     queryset = Genre.objects.all()
+    cache_models = (Genre,)
     serializer_class = serializers.GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ServerTimingMixin, ConditionalGetMixin,
+                   CachedListMixin, CachedRetrieveMixin,
+                   SparseFieldsViewMixin, viewsets.ModelViewSet):
     """Endpoint модели Title."""
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.all()
+    cache_models = (Title, Genre, Category, Review)
+    conditional_targets = {'retrieve': (Title, {'pk': 'pk'})}
+    query_budget = {'list': 4, 'retrieve': 3}
     permission_classes = (permissions.OnlyAdminOrRead,)
-    pagination_class = paginators.StandardResultsSetPagination
+    pagination_class = paginators.TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     ordering_fields = ('-rating', 'category', 'name', 'year')
+    sparse_model_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'category': ('category', 'category__slug', 'category__name'),
+        'genre': (),
+        'year': ('year',),
+        'description': ('description',),
+        'rating': ('rating',),
+    }
+    sparse_required_fields = ('id', 'name')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is serializers.TitleRowSerializer:
+            return queryset.values(*self.get_sparse_model_fields())
+        fields = self.get_sparse_fields()
+        if 'category' in fields:
+            queryset = queryset.select_related('category')
+        if 'genre' in fields:
+            queryset = queryset.prefetch_related('genre')
+        return self.apply_sparse_fields(queryset)
 
     def get_serializer_class(self):
         if self.action in ('retrieve', 'list'):
+            # Формы browsable API запрашивают сериализатор для POST/PUT.
+            if self.request.method in SAFE_METHODS:
+                return serializers.TitleRowSerializer
             return serializers.TitleSerializer
         return serializers.TitleCreateSerializer
 
@@ -123,7 +249,7 @@ class RegistrationAPIView(APIView):
             return Response('username or email already exists.',
                             status=status.HTTP_400_BAD_REQUEST)
         set_confirmation_code(user)
-        send_mail(
+        enqueue_email(
             'Регистрация пользователя',
             f'Это ваш confirmation_code: {user.confirmation_code}',
             settings.RECIPIENTS_EMAIL,
@@ -145,12 +271,36 @@ class JWTView(APIView):
             user.confirmation_code = NOT_PIN_CONFIRMATION_CODE
             user.save()
             return Response(status=status.HTTP_400_BAD_REQUEST)
-        token = RefreshToken.for_user(user)
-        return Response({'token': str(token.access_token)},
+        token = get_access_token(user)
+        return Response({'token': str(token)},
                         status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class MetricsView(APIView):
+    """Метрики запросов в формате Prometheus."""
+    permission_classes = (permissions.OnlyAdmin,)
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(get_queue_gauges()),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class ProfileDownloadView(APIView):
+    """Скачивание .prof файла, сохранённого ProfilingMiddleware."""
+    permission_classes = (permissions.OnlyAdmin,)
+
+    def get(self, request, profile_id):
+        path = get_profile_path(profile_id)
+        if not os.path.exists(path):
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True,
+                            filename=f'{profile_id}.prof')
+
+
+class UserViewSet(ServerTimingMixin, SparseFieldsViewMixin,
+                  viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = serializers.UserSerializer
     permission_classes = (permissions.OnlyAdmin,)
@@ -158,6 +308,12 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = (DjangoFilterBackend, filters.SearchFilter)
     search_fields = ('username',)
     pagination_class = paginators.StandardResultsSetPagination
+    query_budget = {'list': 3, 'retrieve': 2, 'user_info': 4}
+    sparse_model_fields = {
+        name: (name,) for name in serializers.UserSerializer.Meta.fields}
+
+    def get_queryset(self):
+        return self.apply_sparse_fields(super().get_queryset())
 
     @action(
         methods=('get', 'patch'),
@@ -166,7 +322,7 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def user_info(self, request):
-        user = request.user
+        user = get_db_user(request.user)
         if request.method == 'GET':
             return Response(
                 self.get_serializer(user).data,
@@ -29,13 +29,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -103,19 +107,90 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static/'),)
 
+# Права из claims токена, без запроса пользователя к БД. Смена роли
+# и блокировка вступают в силу только с новым токеном, поэтому токены
+# с claims живут STATELESS_TOKEN_LIFETIME.
+STATELESS_JWT_AUTH = False
+STATELESS_TOKEN_LIFETIME = timedelta(minutes=5)
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication'
+        if STATELESS_JWT_AUTH
+        else 'api.authentication.CachedJWTAuthentication',
+    ],
+    # Используют orjson, если он установлен, иначе стандартный json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
 AUTH_USER_MODEL = "reviews.User"
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+# Кэш ответов и ETag/Last-Modified (api.cache). None включает их только
+# с общим для всех процессов бэкендом (Redis, Memcached): в LocMemCache
+# счётчики поколений не видны другим воркерам. True можно задать,
+# если сервер работает в одном процессе.
+CATALOG_CACHE_ENABLED = None
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
+# Заголовок Server-Timing с фазами db, serialize, render и total.
+SERVER_TIMING = False
+
+# Кэш пользователей для api.authentication.CachedJWTAuthentication:
+# число записей и время жизни в секундах.
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+# Порог в миллисекундах для лога медленных SQL-запросов,
+# None отключает логирование.
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Куда ProfilingMiddleware сохраняет .prof файлы в режиме dump.
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
+# Каталог для снимков метрик, общий для процессов WSGI-сервера.
+# Без него /api/v1/metrics/ показывает только текущий процесс,
+# в том числе без метрик отправки писем из воркера send_emails.
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+
+# Предупреждения в лог о превышении query_budget у viewset. Для
+# разработки: при включении каждый запрос считает свои SQL-запросы.
+QUERY_BUDGET_LOGGING = False
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 RECIPIENTS_EMAIL = 'drakyla.96@mail.ru'
 
+# Письма ставятся в очередь и отправляются командой send_emails.
+# EMAIL_OUTBOX_EAGER отправляет их сразу, в запросе (для тестов).
+# Счётчики отправки и время доставки считает воркер: чтобы видеть их
+# в /api/v1/metrics/, задайте METRICS_MULTIPROCESS_DIR и серверу,
+# и воркеру. Глубина очереди считается по БД и видна всегда.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Задержка повтора в секундах: RETRY_BASE * 2 ** (попытка - 1),
+# но не больше RETRY_MAX.
+EMAIL_OUTBOX_RETRY_BASE = 30
+EMAIL_OUTBOX_RETRY_MAX = 60 * 60
+# На сколько секунд воркер резервирует взятые письма.
+EMAIL_OUTBOX_LEASE = 5 * 60
+# Через сколько секунд send_emails удаляет отправленные и отбракованные
+# письма, None — хранить всегда.
+EMAIL_OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
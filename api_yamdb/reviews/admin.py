@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
 
 
 @admin.register(User)
@@ -40,3 +41,13 @@ class ReviewAdmin(admin.ModelAdmin):
 class GenreAdmin(admin.ModelAdmin):
     """Предоставление категории жанров в админке."""
     list_display = ('id', 'name', 'slug')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Предоставление очереди писем в админке."""
+    list_display = ('id', 'subject', 'recipients', 'status', 'attempts',
+                    'next_attempt_at')
+    list_filter = ('status',)
+    # В тексте письма код подтверждения.
+    exclude = ('body',)
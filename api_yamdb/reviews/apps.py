@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import restore_search_index
+        post_migrate.connect(restore_search_index, sender=self)
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def keep_auto_now_add(model, field_names):
+    """
+    bulk_create сохраняет переданные даты вместо текущего времени.
+
+    auto_now_add отключается только у полей из field_names, остальные
+    по-прежнему заполняются при вставке.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+        and (field.name in field_names or field.attname in field_names)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
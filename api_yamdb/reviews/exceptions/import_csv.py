@@ -16,3 +16,11 @@ class NotSetStaticfilesDir(Exception):
 
 class NotFoundPath(Exception):
     pass
+
+
+class RelatedObjectNotFound(Exception):
+    pass
+
+
+class InvalidRow(Exception):
+    pass
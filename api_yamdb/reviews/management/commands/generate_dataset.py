@@ -0,0 +1,231 @@
+import csv
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Callable, Dict, Iterator
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews import models
+from reviews.bulk import keep_auto_now_add
+from reviews.rating import recalculate_ratings
+from reviews.signals import bulk_data_changed
+
+WORDS = (
+    'тень', 'город', 'ветер', 'море', 'последний', 'тайна', 'дорога',
+    'звезда', 'ночь', 'песня', 'история', 'дом', 'время', 'огонь',
+    'сердце', 'мир', 'путь', 'король', 'небо', 'память', 'река', 'зима',
+    'shadow', 'city', 'wind', 'sea', 'last', 'secret', 'road', 'star',
+)
+ROLES = (
+    (models.USER_ROLE, 90),
+    (models.MODERATOR_ROLE, 9),
+    (models.ADMIN_ROLE, 1),
+)
+FIRST_YEAR = 1900
+LAST_YEAR = 2022
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_RANGE_SECONDS = 7 * 365 * 24 * 60 * 60
+# Параметр распределения Парето: у немногих произведений много отзывов.
+PARETO_ALPHA = 1.5
+PARETO_MEAN = PARETO_ALPHA / (PARETO_ALPHA - 1)
+MAX_GENRES_PER_TITLE = 3
+
+# Колонки совпадают с файлами, которые читает import_csv.
+FILES = {
+    'users.csv': ('id', 'username', 'email', 'role', 'bio',
+                  'first_name', 'last_name'),
+    'category.csv': ('id', 'name', 'slug'),
+    'genre.csv': ('id', 'name', 'slug'),
+    'titles.csv': ('id', 'name', 'year', 'category'),
+    'review.csv': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments.csv': ('id', 'review_id', 'text', 'author', 'pub_date'),
+    'genre_title.csv': ('id', 'title_id', 'genre_id'),
+}
+# Для записи в БД колонки csv переводятся в attname полей.
+DB_TARGETS = {
+    'users.csv': (models.User, {}),
+    'category.csv': (models.Category, {}),
+    'genre.csv': (models.Genre, {}),
+    'titles.csv': (models.Title, {'category': 'category_id'}),
+    'review.csv': (models.Review, {'author': 'author_id'}),
+    'comments.csv': (models.Comment, {'author': 'author_id'}),
+    'genre_title.csv': (models.Title.genre.through, {}),
+}
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических данных для нагрузочного тестирования.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument(
+            '--reviews-per-title', type=float, default=10,
+            help='Среднее число отзывов, распределение Парето.')
+        parser.add_argument(
+            '--comments-per-review', type=float, default=2,
+            help='Среднее число комментариев к отзыву.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--output',
+            help='Каталог для csv файлов, которые загружает '
+                 '`import_csv --path <каталог>`. Без параметра данные '
+                 'пишутся сразу в БД.')
+
+    def text(self, words: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=words)).capitalize()
+
+    def date(self) -> str:
+        seconds = self.random.randrange(DATE_RANGE_SECONDS)
+        return (START_DATE + timedelta(seconds=seconds)).isoformat()
+
+    def skewed_count(self, mean: float) -> int:
+        return int(self.random.paretovariate(PARETO_ALPHA)
+                   * mean / PARETO_MEAN)
+
+    def gen_users(self) -> Iterator[dict]:
+        roles, weights = zip(*ROLES)
+        for pk in range(1, self.options['users'] + 1):
+            yield {
+                'id': pk,
+                'username': f'user{pk}',
+                'email': f'user{pk}@yamdb.fake',
+                'role': self.random.choices(roles, weights)[0],
+                'bio': self.text(8),
+                'first_name': self.random.choice(WORDS).capitalize(),
+                'last_name': self.random.choice(WORDS).capitalize(),
+            }
+
+    def gen_slugs(self, prefix: str, count: int) -> Iterator[dict]:
+        for pk in range(1, count + 1):
+            yield {
+                'id': pk,
+                'name': f'{self.text(1)} {pk}',
+                'slug': f'{prefix}-{pk}',
+            }
+
+    def gen_categories(self) -> Iterator[dict]:
+        return self.gen_slugs('category', self.options['categories'])
+
+    def gen_genres(self) -> Iterator[dict]:
+        return self.gen_slugs('genre', self.options['genres'])
+
+    def gen_titles(self) -> Iterator[dict]:
+        for pk in range(1, self.options['titles'] + 1):
+            yield {
+                'id': pk,
+                'name': self.text(self.random.randint(1, 4)),
+                'year': self.random.randint(FIRST_YEAR, LAST_YEAR),
+                'category': self.random.randint(
+                    1, self.options['categories']),
+            }
+
+    def gen_reviews(self) -> Iterator[dict]:
+        users = self.options['users']
+        pk = 0
+        for title_id in range(1, self.options['titles'] + 1):
+            count = min(users, self.skewed_count(
+                self.options['reviews_per_title']))
+            # Один автор может оставить только один отзыв на произведение.
+            for author in self.random.sample(range(1, users + 1), count):
+                pk += 1
+                yield {
+                    'id': pk,
+                    'title_id': title_id,
+                    'text': self.text(self.random.randint(5, 40)),
+                    'author': author,
+                    'score': self.random.randint(
+                        models.MINIMAL_SCORE, models.MAXIMUM_SCORE),
+                    'pub_date': self.date(),
+                }
+        self.reviews_count = pk
+
+    def gen_comments(self) -> Iterator[dict]:
+        pk = 0
+        for review_id in range(1, self.reviews_count + 1):
+            count = self.skewed_count(self.options['comments_per_review'])
+            for _ in range(count):
+                pk += 1
+                yield {
+                    'id': pk,
+                    'review_id': review_id,
+                    'text': self.text(self.random.randint(3, 20)),
+                    'author': self.random.randint(1, self.options['users']),
+                    'pub_date': self.date(),
+                }
+
+    def gen_genre_title(self) -> Iterator[dict]:
+        genres = range(1, self.options['genres'] + 1)
+        pk = 0
+        for title_id in range(1, self.options['titles'] + 1):
+            count = self.random.randint(
+                1, min(MAX_GENRES_PER_TITLE, len(genres)))
+            for genre_id in self.random.sample(genres, count):
+                pk += 1
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+
+    def get_generators(self) -> Dict[str, Callable[[], Iterator[dict]]]:
+        return {
+            'users.csv': self.gen_users,
+            'category.csv': self.gen_categories,
+            'genre.csv': self.gen_genres,
+            'titles.csv': self.gen_titles,
+            'review.csv': self.gen_reviews,
+            'comments.csv': self.gen_comments,
+            'genre_title.csv': self.gen_genre_title,
+        }
+
+    def write_csv(self, file_name: str, rows: Iterator[dict]) -> int:
+        path = os.path.join(self.options['output'], file_name)
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FILES[file_name])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def write_db(self, file_name: str, rows: Iterator[dict]) -> int:
+        model, renames = DB_TARGETS[file_name]
+        count = 0
+        while True:
+            batch = [
+                model(**{renames.get(key, key): value
+                         for key, value in row.items()})
+                for row in islice(rows, self.options['batch_size'])
+            ]
+            if not batch:
+                return count
+            # Сгенерированные pub_date не должны заменяться временем вставки.
+            with keep_auto_now_add(model, FILES[file_name]):
+                model.objects.bulk_create(batch)
+            count += len(batch)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.reviews_count = 0
+        output = options['output']
+        if output is None and models.User.objects.exists():
+            raise CommandError(
+                'Синтетические данные пишутся только в пустую БД.')
+        if output is not None:
+            os.makedirs(output, exist_ok=True)
+        write = self.write_db if output is None else self.write_csv
+        with transaction.atomic():
+            for file_name, generator in self.get_generators().items():
+                count = write(file_name, generator())
+                self.stdout.write(f'{file_name}: {count} строк')
+            if output is None:
+                recalculate_ratings()
+        if output is None:
+            bulk_data_changed.send(
+                sender=self.__class__,
+                models=[model for model, _ in DB_TARGETS.values()])
@@ -1,119 +1,359 @@
 import codecs
 import csv
+import hashlib
 import os
 import re
 import sys
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Set, Tuple
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
 
 from reviews.exceptions.import_csv import (DataAlreadyExist,
                                            DoesNotExistFunction,
-                                           NotFoundPath, NotSetStaticfilesDir,
+                                           InvalidRow, NotFoundPath,
+                                           NotSetStaticfilesDir,
+                                           RelatedObjectNotFound,
                                            UnexpectedFile)
 from reviews import models
+from reviews.bulk import keep_auto_now_add
+from reviews.rating import recalculate_ratings
+from reviews.signals import bulk_data_changed
+
+
+def read_csv(path: str, file_name: str) -> Iterator[dict]:
+    """Построчно читает и проверяет csv файл, не загружая его целиком."""
+    model_ = Command._MODELS_OR_LINKS[file_name]
+    with codecs.open(f'{path}/{file_name}', 'r', 'utf_8_sig') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            try:
+                # Лишние значения DictReader кладёт под ключ None,
+                # недостающие заполняет None.
+                if None in row or None in row.values():
+                    raise ValueError(
+                        'число значений не совпадает с заголовком')
+                yield validate_row(model_, row)
+            except (ValidationError, ValueError, TypeError) as error:
+                raise InvalidRow(file_name, reader.line_num, str(error))
+
+
+def validate_row(model_: dict, row: dict) -> dict:
+    """Приводит значения строки к типам полей модели."""
+    if model_['type'] == 'link':
+        return {name: int(value) for name, value in row.items()}
+    relations = model_.get('relations', ())
+    for name, value in row.items():
+        if name in relations:
+            if value:
+                int(value)
+            continue
+        row[name] = model_['model']._meta.get_field(name).to_python(value)
+    return row
+
+
+def parse_csv(path: str, file_name: str) -> Tuple[list, float]:
+    """Разбор файла целиком в процессе-воркере."""
+    started = time.perf_counter()
+    rows = list(read_csv(path, file_name))
+    return rows, time.perf_counter() - started
 
 
 class Command(BaseCommand):
     help = 'Импорт данных в БД.'
     data_path = None
 
+    # Порядок ключей задаёт порядок записи: сначала те, на кого ссылаются.
     _MODELS_OR_LINKS = {
         'users.csv': {
             'model': models.User,
             'type': 'model',
-            'data': []
         },
         'category.csv': {
             'model': models.Category,
             'type': 'model',
-            'data': []
         },
         'genre.csv': {
             'model': models.Genre,
             'type': 'model',
-            'data': []
         },
         'titles.csv': {
             'model': models.Title,
             'type': 'model',
-            'data': []
+            'relations': ('category',),
         },
         'review.csv': {
             'model': models.Review,
             'type': 'model',
-            'data': []
+            'relations': ('title_id', 'author'),
         },
         'comments.csv': {
             'model': models.Comment,
             'type': 'model',
-            'data': []
+            'relations': ('review_id', 'author'),
         },
         'genre_title.csv': {
             'model': 'Genre_Title',
             'type': 'link',
             'parent': models.Title,
-            'data': []
+            'field': 'genre',
         }
     }
 
     _INDEX_STATICFILES_DIRS = 0
     _SYS_EXIT_CODE = 1
+    _DEFAULT_BATCH_SIZE = 1000
+    _MAX_REPORTED_ORPHANS = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help='Каталог с csv файлами, по умолчанию data/ '
+                 'в первом каталоге STATICFILES_DIRS.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=self._DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном bulk_create.'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Обновить изменившиеся строки вместо пропуска.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Количество процессов для разбора файлов. Файл, '
+                 'разобранный в воркере, держится в памяти до записи.'
+        )
+
+    def get_batches(self, rows: Iterator, size: int) -> Iterator[list]:
+        """Разбивает поток строк на пачки фиксированного размера."""
+        while True:
+            batch = list(islice(rows, size))
+            if not batch:
+                return
+            yield batch
 
-    def parse_file(self, path: str, file_name: str) -> None:
-        """Формирует из файла массив для записи."""
-        if self._MODELS_OR_LINKS.get(file_name) is None:
-            raise UnexpectedFile('Непредвиденный файл: ', file_name)
-        with codecs.open(f'{path}/{file_name}', 'r', 'utf_8_sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                self._MODELS_OR_LINKS[file_name]['data'].append(row)
+    def get_related_ids(self, model) -> Set[int]:
+        """Идентификаторы объектов модели, загружаются одним запросом."""
+        if model not in self._related_ids:
+            self._related_ids[model] = set(
+                model.objects.values_list('pk', flat=True))
+        return self._related_ids[model]
 
-    def _prepare_row(self, value: dict) -> dict:
+    def _prepare_row(self, model_: dict, value: dict) -> dict:
         """Подготовка данных к записи."""
-        if value.get('category'):
-            value['category'] = models.Category.objects.get(
-                pk=value['category'])
-        if value.get('author'):
-            value['author'] = models.User.objects.get(pk=value['author'])
+        for name in model_.get('relations', ()):
+            if not value.get(name):
+                continue
+            field = model_['model']._meta.get_field(name)
+            pk = int(value.pop(name))
+            if pk not in self.get_related_ids(field.related_model):
+                raise RelatedObjectNotFound(
+                    field.related_model.__name__, pk, 'не найден.')
+            value[field.attname] = pk
         return value
 
-    def _model_base(self, model_: dict) -> None:
+    def mark_changed(self, model, objs, stored=()) -> None:
+        """
+        Запоминает модель с изменёнными строками.
+
+        Для отзывов запоминаются и произведения, рейтинг которых нужно
+        пересчитать: текущие и прежние, из `stored`.
+        """
+        if not objs:
+            return
+        self._changed_models.add(model)
+        if model is models.Review:
+            self._rated_title_ids.update(
+                obj.title_id for obj in chain(objs, stored))
+
+    def _model_base(self, model_: dict, rows: Iterator[dict]) -> int:
         """Запись данных в БД."""
-        model_['model'].objects.bulk_create(
-            [model_['model'](**self._prepare_row(row)) for row in
-             model_['data']],
-            ignore_conflicts=True)
+        model = model_['model']
+        count = 0
+        for batch in self.get_batches(rows, self.batch_size):
+            objs = [model(**self._prepare_row(model_, row)) for row in batch]
+            stored = model.objects.only('pk').in_bulk(
+                [obj.pk for obj in objs if obj.pk is not None])
+            with keep_auto_now_add(model, batch[0]):
+                model.objects.bulk_create(objs, ignore_conflicts=True)
+            self.mark_changed(
+                model, [obj for obj in objs if obj.pk not in stored])
+            count += len(batch)
+        # Новые строки могут понадобиться как внешние ключи следующим файлам.
+        self._related_ids.pop(model, None)
+        return count
+
+    def _row_hash(self, obj, fields) -> str:
+        """Хеш содержимого строки по перечисленным полям."""
+        return hashlib.sha1('\x1f'.join(
+            field.value_to_string(obj) for field in fields
+        ).encode()).hexdigest()
 
-    def model_genre_title(self, model_: dict) -> None:
+    def _model_upsert(self, model_: dict, rows: Iterator[dict]) -> int:
+        """Добавление новых и обновление изменившихся строк."""
+        model = model_['model']
+        inserted = updated = unchanged = 0
+        for batch in self.get_batches(rows, self.batch_size):
+            rows_ = [self._prepare_row(model_, row) for row in batch]
+            fields = [
+                model._meta.get_field(name) for name in rows_[0]
+                if name != model._meta.pk.attname
+            ]
+            objs = {}
+            for row in rows_:
+                obj = model(**row)
+                obj.pk = model._meta.pk.to_python(obj.pk)
+                objs[obj.pk] = obj
+            for field in fields:
+                for obj in objs.values():
+                    setattr(obj, field.attname,
+                            field.to_python(field.value_from_object(obj)))
+            stored = model.objects.only(
+                *(field.attname for field in fields)
+            ).in_bulk(list(objs))
+            new, changed = [], []
+            for pk, obj in objs.items():
+                if pk not in stored:
+                    new.append(obj)
+                elif (self._row_hash(obj, fields)
+                        != self._row_hash(stored[pk], fields)):
+                    changed.append(obj)
+            # Даты публикации берутся из csv, иначе следующий запуск
+            # увидит расхождение и перезапишет только что вставленные строки.
+            with keep_auto_now_add(model, rows_[0]):
+                model.objects.bulk_create(new)
+            if changed:
+                model.objects.bulk_update(
+                    changed, [field.attname for field in fields])
+            self.mark_changed(
+                model, new + changed,
+                [stored[obj.pk] for obj in changed])
+            inserted += len(new)
+            updated += len(changed)
+            unchanged += len(objs) - len(new) - len(changed)
+        self._related_ids.pop(model, None)
+        self.stdout.write(
+            f'{model.__name__}: добавлено {inserted}, обновлено {updated}, '
+            f'без изменений {unchanged}.')
+        return inserted + updated + unchanged
+
+    def model_genre_title(self, model_: dict, rows: Iterator[dict]) -> int:
         """Создание связей многие ко многим для моделей Genre и Title."""
-        for raw in model_['data']:
-            title_id = raw['title_id']
-            genre_id = raw['genre_id']
-            title = models.Title.objects.get(pk=title_id)
-            title.genre.add(
-                models.Genre.objects.get(pk=genre_id)
-            )
-
-    def write_db(self) -> None:
-        """Вызов функций записи в БД."""
-        for model_ in self._MODELS_OR_LINKS.values():
-            # В зависимости от модели запускается определенная функция.
-            func_name = '_model_base'
-            if model_['type'] == 'custom_model':
-                func_name = f'model_{model_["model"].__name__.lower()}'
-            if model_['type'] == 'link':
-                func_name = f'model_{model_["model"].lower()}'
-            try:
-                func = getattr(self, func_name)
-                func(model_)
-            except AttributeError:
-                raise DoesNotExistFunction(func_name, 'не определена.')
-            except IntegrityError:
-                raise DataAlreadyExist(model_['model'],
-                                       'данные уже существуют в бд')
+        through = getattr(model_['parent'], model_['field']).through
+        columns = ('title_id', 'genre_id')
+        related_ids = {
+            column: self.get_related_ids(
+                through._meta.get_field(column).related_model)
+            for column in columns
+        }
+        inserted = existing = orphans_count = 0
+        orphans = []
+        for batch in self.get_batches(rows, self.batch_size):
+            links = {}
+            for raw in batch:
+                link = {column: raw[column] for column in columns}
+                if all(link[column] in related_ids[column]
+                       for column in columns):
+                    links[tuple(link[column] for column in columns)] = link
+                    continue
+                orphans_count += 1
+                if len(orphans) < self._MAX_REPORTED_ORPHANS:
+                    orphans.append(link)
+            stored = set(through.objects.filter(
+                title_id__in={link['title_id'] for link in links.values()}
+            ).values_list(*columns))
+            through.objects.bulk_create(
+                [through(**link) for key, link in links.items()
+                 if key not in stored],
+                ignore_conflicts=True)
+            existing += len(stored & links.keys())
+            inserted += len(links.keys() - stored)
+        if inserted:
+            self._changed_models.add(model_['parent'])
+        self.stdout.write(
+            f'{model_["model"]}: добавлено связей {inserted}, '
+            f'без изменений {existing}, пропущено без пары {orphans_count}.')
+        for link in orphans:
+            self.stdout.write(f'  нет объекта для связи {link}')
+        return inserted + existing + orphans_count
+
+    def get_write_func(self, model_: dict):
+        """Функция записи в БД для модели или связи."""
+        # В зависимости от модели запускается определенная функция.
+        func_name = '_model_upsert' if self.upsert else '_model_base'
+        if model_['type'] == 'custom_model':
+            func_name = f'model_{model_["model"].__name__.lower()}'
+        if model_['type'] == 'link':
+            func_name = f'model_{model_["model"].lower()}'
+        func = getattr(self, func_name, None)
+        if func is None:
+            raise DoesNotExistFunction(func_name, 'не определена.')
+        return func
+
+    def write_db(self, path: str, files: List[str]) -> None:
+        """
+        Вызов функций записи в БД.
+
+        С воркерами файлы разбираются параллельно, а запись идёт
+        в порядке зависимостей по мере готовности каждого файла.
+        """
+        pool = (ProcessPoolExecutor(self.workers) if self.workers > 1
+                else nullcontext())
+        with pool as executor:
+            parsed = {}
+            if executor is not None:
+                parsed = {file_name: executor.submit(parse_csv, path,
+                                                     file_name)
+                          for file_name in self._MODELS_OR_LINKS
+                          if file_name in files}
+            for file_name, model_ in self._MODELS_OR_LINKS.items():
+                if file_name not in files:
+                    continue
+                func = self.get_write_func(model_)
+                parse_time = None
+                rows = read_csv(path, file_name)
+                if file_name in parsed:
+                    rows, parse_time = parsed[file_name].result()
+                    rows = iter(rows)
+                started = time.perf_counter()
+                try:
+                    count = func(model_, rows)
+                except IntegrityError:
+                    raise DataAlreadyExist(model_['model'],
+                                           'данные уже существуют в бд')
+                self.report_throughput(file_name, count, parse_time,
+                                       time.perf_counter() - started)
+
+    def report_throughput(self, file_name: str, count: int,
+                          parse_time: float, write_time: float) -> None:
+        """Вывод скорости обработки файла в строках в секунду."""
+        report = f'{file_name}: {count} строк'
+        if parse_time is not None:
+            report += f', разбор {count / max(parse_time, 1e-9):.0f} строк/с'
+        report += f', запись {count / max(write_time, 1e-9):.0f} строк/с'
+        self.stdout.write(report)
+
+    def recalculate_ratings(self) -> None:
+        """Пересчёт рейтинга произведений с изменёнными отзывами."""
+        title_ids = sorted(self._rated_title_ids)
+        size = connection.features.max_query_params or len(title_ids) or 1
+        for start in range(0, len(title_ids), size):
+            recalculate_ratings(models.Title.objects.filter(
+                pk__in=title_ids[start:start + size]))
+        if title_ids:
+            self._changed_models.add(models.Title)
 
     def get_data_path(self) -> str:
         """Формирует путь к каталогу с csv файлами."""
@@ -130,6 +370,12 @@ class Command(BaseCommand):
         if not os.path.isdir(path):
             raise NotFoundPath('Не найден каталог: ', path)
 
+    def validate_files(self, files: List[str]) -> None:
+        """Проверка, что для каждого файла известна модель."""
+        for file_name in files:
+            if self._MODELS_OR_LINKS.get(file_name) is None:
+                raise UnexpectedFile('Непредвиденный файл: ', file_name)
+
     def get_csv_files(self, path: str) -> List[str]:
         """Формирование списка csv файлов."""
         files = os.listdir(path)
@@ -141,19 +387,38 @@ class Command(BaseCommand):
         return csv_files
 
     def handle(self, *args, **options):
+        self.data_path = options['path'] or self.data_path
+        self.batch_size = options['batch_size']
+        self.upsert = options['upsert']
+        self.workers = options['workers']
+        self._related_ids: Dict[type, Set[int]] = {}
+        self._changed_models: Set[type] = set()
+        self._rated_title_ids: Set[int] = set()
         try:
             path = self.get_data_path()
             self.validate_dir(path)
             files = self.get_csv_files(path)
-            for file in files:
-                self.parse_file(path, file)
-            self.write_db()
+            self.validate_files(files)
+            with transaction.atomic():
+                self.write_db(path, files)
+                # bulk_create не вызывает сигналы, рейтинг считаем отдельно.
+                self.recalculate_ratings()
+            if self._changed_models:
+                bulk_data_changed.send(
+                    sender=self.__class__,
+                    models=[model_['model'] for model_ in
+                            self._MODELS_OR_LINKS.values()
+                            if model_['model'] in self._changed_models])
         except UnexpectedFile as error:
             print(error)
         except DoesNotExistFunction as error:
             print(error)
         except DataAlreadyExist as error:
             print(error)
+        except RelatedObjectNotFound as error:
+            print(error)
+        except InvalidRow as error:
+            print(error)
         except NotSetStaticfilesDir as error:
             print(error)
             sys.exit(self._SYS_EXIT_CODE)
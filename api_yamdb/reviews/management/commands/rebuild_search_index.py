@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import is_fts_available, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = ('Перестроение полнотекстового индекса произведений '
+            'с восстановлением триггеров синхронизации.')
+
+    def handle(self, *args, **options):
+        if not is_fts_available():
+            self.stdout.write('Полнотекстовый индекс поддерживается '
+                              'только для SQLite.')
+            return
+        rebuild_search_index()
+        self.stdout.write('Индекс произведений перестроен.')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.rating import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рейтинга произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings()
+        self.stdout.write(f'Пересчитан рейтинг произведений: {updated}')
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    aggregates = Review.objects.order_by().values('title').annotate(
+        total=Sum('score'), count=Count('pk'))
+    for row in aggregates:
+        Title.objects.filter(pk=row['title']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            rating=row['total'] // row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_auto_20220828_1529'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def _execute(statements):
+    def run(apps, schema_editor):
+        # Индекс FTS5 есть только в SQLite, другие СУБД ищут через LIKE.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(_execute(CREATE_SQL), _execute(DROP_SQL)),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from . import validators
 
@@ -48,6 +48,17 @@ class User(AbstractUser):
     )
     email = models.EmailField(max_length=MAX_LENGTH_EMAIL, unique=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Кэш ответов сбрасывается только при смене username.
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_username = self.username
+
     def __str__(self):
         return self.email
 
@@ -83,7 +94,8 @@ class BaseReviewComment(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ['text']
+        # Сортировка совпадает с хвостом составных индексов наследников.
+        ordering = ['pub_date', 'id']
 
 
 class Review(BaseReviewComment, PubDateModel):
@@ -101,10 +113,28 @@ class Review(BaseReviewComment, PubDateModel):
         on_delete=models.CASCADE
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходную оценку и произведение, чтобы обновить
+        # рейтинг на разницу или перенести оценку между произведениями.
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Отзыв и агрегаты рейтинга произведения пишутся в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta(BaseReviewComment.Meta):
         default_related_name = 'reviews'
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -123,6 +153,10 @@ class Comment(BaseReviewComment, PubDateModel):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Коментарии'
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
 
 class BaseGenreCategory(models.Model):
@@ -164,6 +198,9 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    rating_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    rating_count = models.PositiveIntegerField('Количество оценок', default=0)
+    rating = models.IntegerField('Рейтинг', blank=True, null=True)
 
     def __str__(self):
         return self.name
@@ -172,3 +209,50 @@ class Title(models.Model):
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы через Meta: AlterField пересоздаёт таблицу в SQLite
+        # и теряет триггеры полнотекстового индекса.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку командой send_emails."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=MAX_LENGTH_EMAIL)
+    # Адреса получателей, по одному на строку.
+    recipients = models.TextField('Получатели')
+    status = models.CharField(
+        max_length=max(len(status) for status, _ in STATUS_CHOICES),
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField('Попыток отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Поставлено в очередь',
+                                      auto_now_add=True)
+    next_attempt_at = models.DateTimeField('Следующая попытка')
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients}'
+
+    class Meta:
+        ordering = ('next_attempt_at', 'id')
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'],
+                         name='outgoing_email_due_idx'),
+        ]
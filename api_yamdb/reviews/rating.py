@@ -0,0 +1,42 @@
+from django.db.models import (Case, Count, F, IntegerField, OuterRef,
+                              Subquery, Sum, Value, When)
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+
+
+def apply_score(title_id, score_delta, count_delta):
+    """Инкрементально изменяет агрегаты рейтинга произведения."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count__gt=-count_delta,
+                 then=new_sum / new_count),
+            default=Value(None),
+            output_field=IntegerField()
+        )
+    )
+
+
+def recalculate_ratings(queryset=None):
+    """Пересчитывает агрегаты рейтинга с нуля по таблице отзывов."""
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    queryset.update(
+        rating_sum=Coalesce(Subquery(
+            reviews.annotate(total=Sum('score')).values('total'),
+            output_field=IntegerField()), 0),
+        rating_count=Coalesce(Subquery(
+            reviews.annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()), 0),
+    )
+    return queryset.update(rating=Case(
+        When(rating_count__gt=0, then=F('rating_sum') / F('rating_count')),
+        default=Value(None),
+        output_field=IntegerField()
+    ))
@@ -0,0 +1,114 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+
+from .models import Title
+from .signals import bulk_data_changed
+
+FTS_TABLE = 'reviews_title_fts'
+
+# Триггеры синхронизации индекса с reviews_title, как в миграции 0005.
+SEARCH_TRIGGERS = {
+    'reviews_title_fts_ai': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    'reviews_title_fts_ad': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    'reviews_title_fts_au': """
+    CREATE TRIGGER IF NOT EXISTS reviews_title_fts_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+}
+
+
+def is_fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(value):
+    """Экранирует слова запроса и ищет их словоформы по префиксу."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', value))
+
+
+def search_titles(queryset, value):
+    """Отбирает произведения по полнотекстовому запросу, лучшие первыми."""
+    match = build_match_query(value)
+    if not match:
+        return queryset.none()
+    if not is_fts_available():
+        return queryset.filter(
+            Q(name__icontains=value) | Q(description__icontains=value))
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {queryset.model._meta.db_table}.id',
+               f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'bm25({FTS_TABLE})'},
+        order_by=['search_rank'],
+    )
+
+
+def restore_search_triggers(using=DEFAULT_DB_ALIAS):
+    """
+    Создаёт недостающие триггеры индекса, возвращает их имена.
+
+    Django 2.2 в SQLite выполняет AddField/AlterField пересозданием
+    таблицы reviews_title, и триггеры на ней молча пропадают.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {name for name, in cursor.fetchall()}
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+    return missing
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """
+    Восстанавливает триггеры и полностью перестраивает индекс
+    по таблице произведений.
+    """
+    if connections[using].vendor != 'sqlite':
+        return
+    restore_search_triggers(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    # Закэшированные результаты поиска построены по старому индексу.
+    bulk_data_changed.send(sender=rebuild_search_index, models=[Title])
+
+
+def restore_search_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    После migrate перестраивает индекс, если миграция потеряла
+    триггеры: записи без них в индекс не попали.
+    """
+    if connections[using].vendor != 'sqlite':
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+    if restore_search_triggers(using):
+        rebuild_search_index(using)
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Review
+from .rating import apply_score
+
+# Массовая запись в обход post_save/m2m_changed, аргумент models.
+bulk_data_changed = Signal(providing_args=['models'])
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Учитывает новую или изменённую оценку в рейтинге произведения.
+
+    Если отзыв перенесён к другому произведению, оценка вычитается
+    из прежнего и добавляется к новому.
+    """
+    if raw:
+        return
+    if created:
+        apply_score(instance.title_id, instance.score, 1)
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        loaded_title_id = getattr(
+            instance, '_loaded_title_id', None) or instance.title_id
+        if loaded_score is None:
+            # Оценка не загружалась, разницу посчитать не из чего.
+            loaded_score = instance.score
+        if loaded_title_id != instance.title_id:
+            apply_score(loaded_title_id, -loaded_score, -1)
+            apply_score(instance.title_id, instance.score, 1)
+        elif loaded_score != instance.score:
+            apply_score(instance.title_id,
+                        instance.score - loaded_score, 0)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения."""
+    apply_score(instance.title_id, -instance.score, -1)
@@ -31,6 +31,29 @@ if FILENAME not in project_dir_content:
 
 assert get_version() < '3.0.0', 'Пожалуйста, используйте версию Django < 3.0.0'
 
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.authentication import user_cache
+    cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def catalog_cache(settings):
+    # Тесты работают в одном процессе, локальный кэш здесь общий.
+    settings.CATALOG_CACHE_ENABLED = True
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    settings.EMAIL_OUTBOX_EAGER = True
+
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
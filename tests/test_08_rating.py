@@ -0,0 +1,63 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test08Rating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_on_delete(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        assert admin_client.get(url).json().get('rating') == 3, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается'
+        )
+        for review in reviews[1:]:
+            admin_client.delete(f'{url}reviews/{review["id"]}/')
+        assert admin_client.get(url).json().get('rating') is None, (
+            'Проверьте, что без отзывов `rating` равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recalculate_rating(self, admin_client, admin):
+        from reviews.models import Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('recalculate_rating')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            12, 3, 4), (
+            'Проверьте, что команда `recalculate_rating` восстанавливает '
+            'агрегаты рейтинга'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_moved_to_other_title(self, admin_client, admin):
+        from reviews.models import Review, Title
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        review = Review.objects.get(pk=reviews[1]['id'])
+        old_title_id = review.title_id
+        new_title_id = next(title['id'] for title in titles
+                            if title['id'] != old_title_id)
+        Review.objects.filter(
+            author=review.author, title_id=new_title_id).delete()
+        review = Review.objects.get(pk=reviews[1]['id'])
+        review.title_id = new_title_id
+        review.score = 10
+        review.save()
+        review.save()
+        aggregates = {
+            title.pk: (title.rating_sum, title.rating_count, title.rating)
+            for title in Title.objects.all()
+        }
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('recalculate_rating')
+        for title in Title.objects.all():
+            assert aggregates[title.pk] == (
+                title.rating_sum, title.rating_count, title.rating), (
+                'Проверьте, что при переносе отзыва к другому произведению '
+                'оценка вычитается из прежнего и добавляется к новому'
+            )
@@ -0,0 +1,37 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test09CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url, {'pagination': 'cursor', 'count': 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            'Проверьте, что `?pagination=cursor` включает курсорную пагинацию'
+        )
+        ids = [review['id'] for review in data['results']]
+        data = client.get(data['next']).json()
+        ids += [review['id'] for review in data['results']]
+        assert ids == [review['id'] for review in reviews], (
+            'Проверьте, что курсорная пагинация отдаёт отзывы по '
+            '(pub_date, id) без пропусков'
+        )
+        assert data['next'] is None and data['previous']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_default_pagination(self, client, admin_client, admin):
+        create_reviews(admin_client, admin)
+        data = client.get('/api/v1/titles/').json()
+        assert data['count'] == 2, (
+            'Проверьте, что без параметров сохраняется постраничная '
+            'пагинация с `count`'
+        )
+        data = client.get('/api/v1/titles/', {'pagination': 'cursor'}).json()
+        assert [title['name'] for title in data['results']] == [
+            'Поворот туда', 'Проект']
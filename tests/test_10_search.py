@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+
+from .common import create_titles
+
+
+class Test10TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/', {'search': 'драма'})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 1 and (
+            data['results'][0]['id'] == titles[1]['id']), (
+            'Проверьте, что `?search=` ищет по названию и описанию'
+        )
+        data = client.get('/api/v1/titles/', {'search': 'поворо'}).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[0]['id']], (
+            'Проверьте, что `?search=` находит словоформы по префиксу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_index_sync(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'name': 'Переименовано'})
+        data = client.get('/api/v1/titles/', {'search': 'переименовано'})
+        assert data.json()['count'] == 1
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        data = client.get('/api/v1/titles/', {'search': 'переименовано'})
+        assert data.json()['count'] == 0, (
+            'Проверьте, что индекс поиска обновляется при удалении'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_restores_triggers(self, client, admin_client):
+        from django.core.management import call_command
+        from django.db import connection
+
+        from reviews.search import SEARCH_TRIGGERS, restore_search_index
+        titles, _, _ = create_titles(admin_client)
+
+        def drop_triggers():
+            # Так триггеры теряются, когда миграция пересоздаёт таблицу.
+            with connection.cursor() as cursor:
+                for name in SEARCH_TRIGGERS:
+                    cursor.execute(f'DROP TRIGGER {name}')
+
+        def search(value):
+            return client.get(
+                '/api/v1/titles/', {'search': value}).json()['count']
+
+        drop_triggers()
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'name': 'Переименовано'})
+        assert search('переименовано') == 0
+        call_command('rebuild_search_index', stdout=StringIO())
+        assert search('переименовано') == 1
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'name': 'Снова'})
+        assert search('снова') == 1, (
+            'Проверьте, что rebuild_search_index восстанавливает триггеры '
+            'синхронизации индекса'
+        )
+
+        drop_triggers()
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/',
+                           data={'name': 'После миграции'})
+        restore_search_index(sender=None)
+        assert search('миграции') == 1
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert search('миграции') == 0, (
+            'Проверьте, что после migrate недостающие триггеры '
+            'восстанавливаются, а индекс перестраивается'
+        )
@@ -0,0 +1,145 @@
+import pytest
+
+from .common import create_genre, create_reviews
+
+
+class Test11ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_hit(self, client, admin_client,
+                          django_assert_num_queries):
+        create_genre(admin_client)
+        first = client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/genres/')
+        assert first.json() == second.json(), (
+            'Проверьте, что повторный GET `/api/v1/genres/` отдаётся из кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cache_invalidation(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] == 4
+        admin_client.patch(f'{url}reviews/{reviews[1]["id"]}/',
+                           data={'score': 9})
+        assert client.get(url).json()['rating'] == 6, (
+            'Проверьте, что изменение отзыва сбрасывает кэш произведения'
+        )
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Сказка', 'slug': 'tale'})
+        slugs = [genre['slug'] for genre in
+                 client.get('/api/v1/genres/', {'count': 10}).json()[
+                     'results']]
+        assert 'tale' in slugs
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_conditional_get(self, client, admin_client, admin,
+                                django_assert_num_queries):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            'Проверьте, что список отзывов отдаёт `ETag` и `Last-Modified`'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == 304
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'new'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения отзыва `ETag` меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_generation_bumped_after_commit(self, admin_client):
+        from django.db import transaction
+
+        from api.cache import get_generation
+        from reviews.models import Genre
+        before = get_generation(Genre)
+        with transaction.atomic():
+            Genre.objects.create(name='Сказка', slug='tale')
+            assert get_generation(Genre) == before, (
+                'Проверьте, что поколение сдвигается только после коммита'
+            )
+        assert get_generation(Genre) > before
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_conditional_get_missing_object(self, client, admin_client,
+                                               admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        last_modified = client.get(url)['Last-Modified']
+        for missing in ('/api/v1/titles/99999/',
+                        '/api/v1/titles/99999/reviews/',
+                        f'{url}reviews/99999/',
+                        f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+                        f'{reviews[0]["id"]}/comments/'):
+            response = client.get(
+                missing, HTTP_IF_MODIFIED_SINCE=last_modified)
+            assert response.status_code == 404, (
+                'Проверьте, что для несуществующего объекта '
+                f'`{missing}` условный GET возвращает 404, а не 304'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_user_generation(self, client, admin_client, admin):
+        from api.cache import get_generation
+        from reviews.models import User
+        before = get_generation(User)
+        client.post('/api/v1/auth/signup/',
+                    data={'username': 'etag', 'email': 'etag@yamdb.fake'})
+        client.post('/api/v1/auth/token/',
+                    data={'username': 'etag', 'confirmation_code': '0'})
+        assert get_generation(User) == before, (
+            'Проверьте, что регистрация и вход не сбрасывают ETag отзывов'
+        )
+        admin_client.patch('/api/v1/users/etag/', data={'username': 'etag2'})
+        assert get_generation(User) > before, (
+            'Проверьте, что смена username сбрасывает кэш ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_cache_key_includes_host(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        for host in ('internal:8000', 'api.example.com'):
+            response = client.get(
+                '/api/v1/genres/', {'count': 1}, HTTP_HOST=host)
+            assert response.json()['next'].startswith(f'http://{host}/'), (
+                'Проверьте, что ключ кэша учитывает хост запроса и ссылки '
+                'пагинации не отдаются с чужим хостом'
+            )
+        etags = {
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/',
+                       HTTP_HOST=host)['ETag']
+            for host in ('internal:8000', 'api.example.com')
+        }
+        assert len(etags) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_local_cache_disabled(self, settings, client, admin_client,
+                                     admin, django_assert_num_queries):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        settings.CATALOG_CACHE_ENABLED = None
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert 'ETag' not in response and 'Last-Modified' not in response, (
+            'Проверьте, что с LocMemCache условный GET выключен: поколения '
+            'в нём не видны другим процессам'
+        )
+        client.get('/api/v1/genres/')
+        with django_assert_num_queries(2):
+            client.get('/api/v1/genres/')
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/tmp/yamdb-test-cache',
+        }}
+        from api.cache import is_catalog_cache_enabled
+        assert is_catalog_cache_enabled(), (
+            'Проверьте, что с общим бэкендом кэш включается автоматически'
+        )
@@ -0,0 +1,73 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+def get_budget(path, method='get'):
+    from api.middleware import get_query_budget
+    view = resolve(path).func
+    return get_query_budget(view.cls, view.actions[method])
+
+
+class Test12QueryBudget:
+
+    @pytest.fixture
+    def dataset(self):
+        from io import StringIO
+        call_command('generate_dataset', users=20, titles=20,
+                     reviews_per_title=10, comments_per_review=5,
+                     stdout=StringIO())
+        from reviews.models import Review
+        return Review.objects.order_by('-comments__id').first()
+
+    def assert_budget(self, client, path):
+        budget = get_budget(path.split('?')[0])
+        assert budget is not None, f'Не задан query_budget для `{path}`'
+        for count in (1, 20):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path, {'count': count})
+            assert response.status_code == 200
+            assert len(queries) <= budget, (
+                f'`{path}` с count={count} выполняет {len(queries)} '
+                f'SQL-запросов, бюджет {budget}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_catalog_budgets(self, dataset, client, user_client):
+        title, review = dataset.title_id, dataset.pk
+        paths = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title}/',
+            f'/api/v1/titles/{title}/reviews/',
+            f'/api/v1/titles/{title}/reviews/{review}/',
+            f'/api/v1/titles/{title}/reviews/{review}/comments/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+        )
+        for path in paths:
+            self.assert_budget(client, path)
+            self.assert_budget(user_client, path)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_budgets(self, dataset, admin, admin_client):
+        for path in ('/api/v1/users/', f'/api/v1/users/{admin.username}/',
+                     '/api/v1/users/me/'):
+            self.assert_budget(admin_client, path)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_budget_logging(self, settings, caplog, client):
+        from api.views import GenreViewSet
+        settings.QUERY_BUDGET_LOGGING = True
+        with mock.patch.object(GenreViewSet, 'query_budget', {'list': 0}):
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert any('GenreViewSet.list' in record.getMessage()
+                   for record in caplog.records), (
+            'Проверьте, что превышение query_budget пишется в лог'
+        )
@@ -0,0 +1,74 @@
+import pytest
+
+
+class Test13Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_admin_only(self, client, user_client):
+        assert client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_metrics_format(self, client, admin_client):
+        client.get('/api/v1/genres/')
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in body
+        assert ('yamdb_http_requests_total'
+                '{route="genres-list",method="GET"}') in body
+        assert ('yamdb_db_queries_per_request_bucket'
+                '{route="genres-list",method="GET",le="+Inf"}') in body
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_metrics_multiprocess(self, client, admin_client, settings,
+                                     tmp_path):
+        import json
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        other = [[['genres-list', 'GET'], 1000]]
+        (tmp_path / '1.json').write_text(
+            json.dumps({'yamdb_http_requests_total': other}))
+        client.get('/api/v1/genres/')
+        body = admin_client.get('/api/v1/metrics/').content.decode()
+        line = next(line for line in body.splitlines() if line.startswith(
+            'yamdb_http_requests_total{route="genres-list"'))
+        assert int(line.split()[-1]) > 1000, (
+            'Проверьте, что метрики суммируются по файлам всех процессов'
+        )
+
+    def test_04_concurrent_flush(self, settings, tmp_path):
+        import json
+        import threading
+
+        from api.metrics import Registry
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path)
+        registry = Registry()
+        registry.inc('yamdb_user_cache_hits_total', ())
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(50):
+                    registry.flush(force=True)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, (
+            'Проверьте, что одновременный сброс метрик из нескольких '
+            'потоков не приводит к ошибкам'
+        )
+        files = list(tmp_path.iterdir())
+        assert [file.suffix for file in files] == ['.json']
+        json.loads(files[0].read_text())
+
+    def test_05_flush_error_is_logged(self, settings, tmp_path, caplog):
+        from api.metrics import Registry
+        settings.METRICS_MULTIPROCESS_DIR = str(tmp_path / 'missing')
+        Registry().flush(force=True)
+        assert 'снимок метрик' in caplog.text
@@ -0,0 +1,27 @@
+import re
+
+import pytest
+
+from .common import create_reviews
+
+
+class Test14ServerTiming:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_server_timing_header(self, settings, admin_client, admin):
+        settings.SERVER_TIMING = True
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        from rest_framework.test import APIClient
+        response = APIClient().get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        header = response['Server-Timing']
+        for phase in ('db', 'serialize', 'render', 'total'):
+            assert re.search(rf'\b{phase};dur=\d+\.\d+', header), (
+                f'Проверьте, что в заголовке Server-Timing есть фаза `{phase}`'
+            )
+        assert re.search(r'db;dur=[\d.]+;desc="queries=\d+"', header)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_server_timing_disabled(self, client):
+        response = client.get('/api/v1/genres/')
+        assert 'Server-Timing' not in response
@@ -0,0 +1,30 @@
+import pytest
+
+
+class Test15Profiling:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_profile_summary(self, admin_client, user_client):
+        response = admin_client.get('/api/v1/genres/',
+                                    HTTP_X_PROFILE='summary')
+        assert response['X-Profiled-Status'] == '200'
+        assert 'cumulative' in response.content.decode(), (
+            'Проверьте, что администратор получает сводку cProfile'
+        )
+        response = user_client.get('/api/v1/genres/', {'profile': 'summary'})
+        assert response.json()['results'] == [], (
+            'Проверьте, что профилирование доступно только администратору'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_profile_dump(self, admin_client, user_client, settings,
+                             tmp_path):
+        settings.PROFILING_DIR = str(tmp_path)
+        response = admin_client.get('/api/v1/genres/', {'profile': 'dump'})
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+        url = f'/api/v1/profiles/{profile_id}/'
+        assert user_client.get(url).status_code == 403
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content)
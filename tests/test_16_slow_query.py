@@ -0,0 +1,21 @@
+import logging
+
+import pytest
+
+
+class Test16SlowQuery:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_slow_query_log(self, client, settings, caplog):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.slow_query'):
+            client.get('/api/v1/titles/', {'name': 'x'})
+        messages = [record.getMessage() for record in caplog.records
+                    if record.name == 'api.slow_query']
+        assert messages, 'Проверьте, что медленные запросы логируются'
+        message = next(m for m in messages if 'reviews_title' in m)
+        assert 'LIKE' in message and '%x%' in message
+        assert 'api_yamdb' in message.split('вызван из: ')[1]
+        assert 'SCAN' in message, (
+            'Проверьте, что в лог попадает EXPLAIN QUERY PLAN'
+        )
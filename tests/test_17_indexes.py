@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+class Test17Indexes:
+
+    @pytest.mark.django_db
+    def test_01_review_list_uses_index(self):
+        from reviews.models import Review
+        plan = explain(Review.objects.filter(title_id=1)[:5])
+        assert 'review_title_pub_date_idx' in plan, (
+            'Проверьте, что список отзывов произведения читается по индексу '
+            f'(title, pub_date, id). План: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что отзывы не сортируются отдельно. План: {plan}'
+        )
+
+    @pytest.mark.django_db
+    def test_02_comment_list_uses_index(self):
+        from reviews.models import Comment
+        plan = explain(Comment.objects.filter(review_id=1)[:5])
+        assert 'comment_review_pub_date_idx' in plan, (
+            'Проверьте, что список комментариев читается по индексу '
+            f'(review, pub_date, id). План: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan
+
+    @pytest.mark.django_db
+    def test_03_title_filters_use_index(self):
+        from reviews.models import Title
+        plan = explain(Title.objects.filter(year=2000).order_by())
+        assert 'USING INDEX' in plan, (
+            f'Проверьте, что фильтр по году использует индекс. План: {plan}'
+        )
+        plan = explain(Title.objects.filter(category_id=1).order_by())
+        assert 'USING INDEX' in plan
+        plan = explain(Title.objects.all()[:5])
+        assert 'title_name_idx' in plan and 'TEMP B-TREE' not in plan
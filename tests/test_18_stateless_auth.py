@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from .common import create_titles
+
+
+def token_client(user):
+    user.confirmation_code = '123456'
+    user.save()
+    response = APIClient().post('/api/v1/auth/token/', data={
+        'username': user.username, 'confirmation_code': '123456'})
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return client
+
+
+@pytest.fixture
+def stateless(settings):
+    from api.authentication import StatelessJWTAuthentication
+    settings.STATELESS_JWT_AUTH = True
+    with mock.patch.object(APIView, 'authentication_classes',
+                           [StatelessJWTAuthentication]):
+        yield
+
+
+class Test18StatelessAuth:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_admin_without_user_query(self, stateless, admin,
+                                         django_assert_num_queries):
+        client = token_client(admin)
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/users/', {'count': 1})
+        assert response.status_code == 200, (
+            'Проверьте, что права администратора берутся из токена, '
+            'без запроса пользователя к БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_actions(self, stateless, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        client = token_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+        response = client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                               data={'text': 'Текст', 'score': 5})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        response = client.patch('/api/v1/users/me/', data={'bio': 'new'})
+        assert response.status_code == 200
+        assert response.json()['bio'] == 'new'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_short_token_lifetime(self, stateless, settings, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.authentication import get_access_token
+        token = get_access_token(admin)
+        assert token['role'] == admin.role
+        lifetime = token['exp'] - AccessToken.for_user(admin)['exp']
+        assert lifetime < 0, (
+            'Проверьте, что токены с claims живут '
+            '`STATELESS_TOKEN_LIFETIME`, а не `ACCESS_TOKEN_LIFETIME`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_disabled_by_default(self, admin):
+        client = token_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.is_staff = False
+        admin.is_superuser = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что по умолчанию права берутся из БД и смена роли '
+            'действует на уже выданный токен'
+        )
+        admin.is_active = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401
@@ -0,0 +1,86 @@
+import pytest
+
+
+class Test19UserCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_user(self, user_client, django_assert_num_queries):
+        from api.authentication import user_cache
+        user_client.get('/api/v1/users/me/')
+        hits = user_cache.hits
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert user_cache.hits == hits + 1, (
+            'Проверьте, что пользователь берётся из кэша аутентификации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_evicts(self, admin_client, user, user_client):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(f'/api/v1/users/{user.username}/',
+                                      data={'role': 'admin'})
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сразу сбрасывает кэш пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cache_metrics(self, admin_client):
+        admin_client.get('/api/v1/users/me/')
+        body = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'yamdb_user_cache_hits_total ' in body
+        assert 'yamdb_user_cache_misses_total ' in body
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_eviction_during_load(self, user):
+        from unittest import mock
+
+        from api.authentication import user_cache
+        from reviews.models import User
+        load = User.objects.get
+
+        def load_then_save(**kwargs):
+            loaded = load(**kwargs)
+            load(pk=user.pk).save()
+            return loaded
+
+        with mock.patch.object(User.objects, 'get', load_then_save):
+            user_cache.get(user.pk)
+        assert user.pk not in user_cache.entries, (
+            'Проверьте, что строка, загруженная до сохранения пользователя, '
+            'не попадает в кэш'
+        )
+        assert not user_cache.loading
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_no_state_for_saved_users(self, user, django_user_model):
+        from api.authentication import user_cache
+        for number in range(20):
+            django_user_model.objects.create_user(
+                username=f'bulk{number}', email=f'bulk{number}@yamdb.fake')
+        user.save()
+        with pytest.raises(django_user_model.DoesNotExist):
+            user_cache.get(0)
+        user_cache.get(user.pk)
+        assert not user_cache.loading, (
+            'Проверьте, что кэш пользователей не хранит состояние '
+            'для каждого сохранённого пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_issued_token_sees_role_change(self, user):
+        from rest_framework.test import APIClient
+        user.confirmation_code = '123456'
+        user.save()
+        token = APIClient().post('/api/v1/auth/token/', data={
+            'username': user.username, 'confirmation_code': '123456'
+        }).json()['token']
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что токен из `/auth/token/` учитывает смену роли'
+        )
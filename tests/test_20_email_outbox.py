@@ -0,0 +1,151 @@
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+class Test20EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues(self, client, settings):
+        from reviews.models import OutgoingEmail
+        settings.EMAIL_OUTBOX_EAGER = False
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при регистрации письмо не отправляется в запросе'
+        )
+        message = OutgoingEmail.objects.get()
+        assert message.status == OutgoingEmail.PENDING
+        assert message.recipients == self.data['email']
+
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда send_emails отправляет письма из очереди'
+        )
+        assert mail.outbox[0].to == [self.data['email']]
+        message.refresh_from_db()
+        assert message.status == OutgoingEmail.SENT
+        assert message.sent_at is not None
+
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не уходит повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        client.post(self.url_signup, data=self.data)
+        with mock.patch('django.core.mail.EmailMessage.send',
+                        side_effect=OSError('smtp down')):
+            call_command('send_emails', '--once')
+            message = OutgoingEmail.objects.get()
+            assert message.status == OutgoingEmail.PENDING
+            assert message.attempts == 1
+            assert message.last_error == 'smtp down'
+            assert message.next_attempt_at > message.created_at, (
+                'Проверьте, что повторная отправка откладывается'
+            )
+
+            call_command('send_emails', '--once')
+            message.refresh_from_db()
+            assert message.attempts == 1, (
+                'Проверьте, что письмо не отправляется раньше '
+                'времени следующей попытки'
+            )
+
+            OutgoingEmail.objects.update(next_attempt_at=message.created_at)
+            call_command('send_emails', '--once')
+            message.refresh_from_db()
+            assert message.status == OutgoingEmail.FAILED, (
+                'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток '
+                'письмо помечается как не отправленное'
+            )
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_queue_metrics(self, admin_client, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        client.post(self.url_signup, data=self.data)
+        body = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'yamdb_email_queue_depth 1' in body, (
+            'Проверьте, что /api/v1/metrics/ показывает глубину очереди писем'
+        )
+        assert 'yamdb_email_oldest_pending_seconds ' in body
+
+        call_command('send_emails', '--once')
+        body = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'yamdb_email_queue_depth 0' in body
+        assert 'yamdb_emails_sent_total ' in body
+        assert 'yamdb_email_delivery_seconds_count ' in body
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_connection_failure(self, client, settings):
+        from reviews.models import OutgoingEmail
+        settings.EMAIL_OUTBOX_EAGER = False
+        client.post(self.url_signup, data=self.data)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open',
+                        side_effect=ConnectionRefusedError('refused')):
+            call_command('send_emails', '--once')
+        message = OutgoingEmail.objects.get()
+        assert message.status == OutgoingEmail.PENDING
+        assert message.attempts == 1, (
+            'Проверьте, что недоступный SMTP-сервер засчитывается '
+            'как неудачная попытка, а воркер не падает'
+        )
+        assert message.last_error == 'refused'
+        assert message.next_attempt_at > message.created_at
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_body_erased_and_pruned(self, client, settings,
+                                       user_superuser):
+        from datetime import timedelta
+
+        from reviews.models import OutgoingEmail, User
+        settings.EMAIL_OUTBOX_EAGER = False
+        client.post(self.url_signup, data=self.data)
+        code = User.objects.get(
+            username=self.data['username']).confirmation_code
+        message = OutgoingEmail.objects.get()
+        client.force_login(user_superuser)
+        response = client.get(
+            f'/admin/reviews/outgoingemail/{message.pk}/change/')
+        assert response.status_code == 200
+        assert code not in response.content.decode(), (
+            'Проверьте, что админка не показывает код подтверждения'
+        )
+
+        call_command('send_emails', '--once')
+        assert code in mail.outbox[0].body
+        message.refresh_from_db()
+        assert message.body == '', (
+            'Проверьте, что после отправки текст письма с кодом стирается'
+        )
+
+        OutgoingEmail.objects.update(
+            sent_at=message.sent_at - timedelta(
+                seconds=settings.EMAIL_OUTBOX_RETENTION + 1))
+        client.post(self.url_signup, data=self.data)
+        call_command('send_emails', '--once')
+        assert OutgoingEmail.objects.count() == 1, (
+            'Проверьте, что send_emails удаляет письма старше '
+            'EMAIL_OUTBOX_RETENTION'
+        )
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.SENT
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_delivery_buckets(self, admin_client, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        client.post(self.url_signup, data=self.data)
+        call_command('send_emails', '--once')
+        body = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'yamdb_email_delivery_seconds_bucket{le="3600"}' in body, (
+            'Проверьте, что у времени доставки писем корзины до часов'
+        )
@@ -0,0 +1,81 @@
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews, create_titles
+
+
+def count_selects(queries, table):
+    return sum(
+        1 for query in queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    )
+
+
+class Test21NestedParents:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_create_loads_title_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}
+            )
+        assert response.status_code == 201
+        assert count_selects(context.captured_queries, 'reviews_title') == 1, (
+            'Проверьте, что при создании отзыва произведение '
+            'загружается из БД один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicate_review_uses_constraint(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400
+        assert count_selects(context.captured_queries, 'reviews_review') == 0, (
+            'Проверьте, что повторный отзыв отсекается ограничением '
+            'unique_author_title, а не отдельным запросом'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Можно оставить только 1 отзыв.']
+        }, (
+            'Проверьте, что ошибка повторного отзыва возвращается '
+            'в поле non_field_errors'
+        )
+        response = admin_client.get(url)
+        assert response.json()['count'] == 1
+        assert response.json()['results'][0]['score'] == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_comment_create_loads_review_once(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/comments/',
+                data={'text': 'Комментарий'}
+            )
+        assert response.status_code == 201
+        assert count_selects(
+            context.captured_queries, 'reviews_review') == 1, (
+            'Проверьте, что при создании комментария отзыв '
+            'загружается из БД один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_other_integrity_error_not_duplicate(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        error = IntegrityError('FOREIGN KEY constraint failed')
+        with mock.patch('reviews.models.Review.save', side_effect=error):
+            with pytest.raises(IntegrityError):
+                admin_client.post(
+                    f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                    data={'text': 'Отзыв', 'score': 5}
+                )
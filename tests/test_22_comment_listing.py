@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test22CommentListing:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_fixed_queries(self, admin_client, admin, client):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert response.json()['count'] > 0
+        assert all(
+            comment['author'] for comment in response.json()['results'])
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что список комментариев получается запросами '
+            'count и страницы, без загрузки отзыва и авторов по одному'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_wrong_review_404(self, admin_client, admin, client):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что для отзыва другого произведения '
+            'возвращается статус 404'
+        )
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/999/comments/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_empty_review(self, admin_client, admin, client):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[2]["id"]}/comments/')
+        assert response.status_code == 200, (
+            'Проверьте, что для отзыва без комментариев '
+            'возвращается пустой список'
+        )
+        assert response.json()['results'] == []
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_titles
+
+
+class Test23SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_fields(self, admin_client, client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Проверьте, что `?fields=` оставляет в ответе только '
+                'перечисленные поля произведения'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что жанры не загружаются, если они не запрошены'
+        )
+        assert 'reviews_category' not in sql
+        assert '"description"' not in sql, (
+            'Проверьте, что запрос к БД ограничен запрошенными полями'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_omit(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?omit=description,genre')
+        assert response.status_code == 200
+        assert set(response.json()) == {
+            'id', 'name', 'category', 'year', 'rating'}, (
+            'Проверьте, что `?omit=` убирает поля из ответа'
+        )
+        assert response.json()['category']['slug'] == titles[0]['category']
+        full = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert set(full) == {'id', 'name', 'category', 'genre', 'year',
+                             'description', 'rating'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_comment_fields(self, admin_client, admin, client):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?fields=id,score')
+        assert response.status_code == 200
+        assert [set(review) for review in response.json()['results']] == [
+            {'id', 'score'}] * len(reviews)
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_user' not in sql, (
+            'Проверьте, что авторы не загружаются, если они не запрошены'
+        )
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что отложенные поля не догружаются по одному'
+        )
+        response = client.get(
+            f'{url}{reviews[0]["id"]}/comments/?fields=author')
+        assert response.status_code == 200
+        assert {comment['author'] for comment in response.json()['results']}
+        for comment in response.json()['results']:
+            assert set(comment) == {'author'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_user_fields(self, admin_client, admin):
+        response = admin_client.get(
+            f'/api/v1/users/{admin.username}/?fields=username,role')
+        assert response.status_code == 200
+        assert response.json() == {
+            'username': admin.username, 'role': admin.role}
+        response = admin_client.get('/api/v1/users/?omit=bio,email')
+        for user in response.json()['results']:
+            assert 'bio' not in user and 'email' not in user
+            assert 'username' in user
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_writes_ignore_fields(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/users/?fields=username',
+            data={'username': 'sparse', 'email': 'sparse@yamdb.fake'}
+        )
+        assert response.status_code == 201
+        assert response.json()['email'] == 'sparse@yamdb.fake', (
+            'Проверьте, что `?fields=` не влияет на запросы на запись'
+        )
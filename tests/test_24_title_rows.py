@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+
+@pytest.fixture
+def dataset():
+    from reviews.models import Genre, Title
+    call_command('generate_dataset', users=20, titles=60, genres=8,
+                 categories=3, reviews_per_title=2, comments_per_review=0,
+                 seed=3, stdout=StringIO())
+    Title.objects.create(name='Без категории', year=2000)
+    title = Title.objects.create(name='Ааа жанры', year=1999,
+                                 description='Все жанры')
+    title.genre.set(Genre.objects.all())
+    return Title.objects.order_by('id').first()
+
+
+def get_with_model_serializer(client, url):
+    from api.serializers import TitleSerializer
+    from api.views import TitleViewSet
+    cache.clear()
+    with mock.patch.object(TitleViewSet, 'get_serializer_class',
+                           lambda self: TitleSerializer):
+        return client.get(url)
+
+
+class Test24TitleRows:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_parity(self, client, dataset):
+        genre = dataset.genre.first()
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?count=1000',
+            '/api/v1/titles/?page=2&count=7',
+            '/api/v1/titles/?pagination=cursor&count=20',
+            f'/api/v1/titles/?genre={genre.slug}&count=100',
+            f'/api/v1/titles/?category={dataset.category.slug}',
+            f'/api/v1/titles/?year={dataset.year}',
+            f'/api/v1/titles/?search={dataset.name.split()[0]}',
+            '/api/v1/titles/?search=жанры',
+            '/api/v1/titles/?fields=id,genre,rating&count=100',
+            '/api/v1/titles/?omit=genre,category&count=100',
+            '/api/v1/titles/?fields=category,description&count=100',
+            f'/api/v1/titles/{dataset.pk}/',
+            f'/api/v1/titles/{dataset.pk}/?fields=genre',
+            '/api/v1/titles/999999/',
+        )
+        for url in urls:
+            cache.clear()
+            response = client.get(url)
+            expected = get_with_model_serializer(client, url)
+            assert response.status_code == expected.status_code, url
+            assert response.content == expected.content, (
+                'Проверьте, что быстрое чтение произведений отдаёт тот же '
+                f'JSON, что и TitleSerializer: {url}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_edge_values(self, client, dataset):
+        data = client.get('/api/v1/titles/?search=категории').json()
+        title = data['results'][0]
+        assert title['category'] is None
+        assert title['genre'] == []
+        assert title['description'] is None
+        assert title['rating'] is None
+        data = client.get('/api/v1/titles/?search=жанры').json()
+        names = [genre['name'] for genre in data['results'][0]['genre']]
+        assert names == sorted(names), (
+            'Проверьте, что жанры произведения отсортированы по названию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_query_count(self, client, dataset, django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?count=1000')
+        assert len(response.json()['results']) == 62
+        with django_assert_num_queries(2):
+            client.get('/api/v1/titles/?count=1000&omit=genre')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_writes_use_model_serializer(self, dataset, admin_client):
+        response = admin_client.patch(f'/api/v1/titles/{dataset.pk}/',
+                                      data={'name': 'Новое название'})
+        assert response.status_code == 200
+        assert response.json()['name'] == 'Новое название'
+        response = admin_client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='text/html')
+        assert response.status_code == 200, (
+            'Проверьте, что browsable API со списком произведений работает'
+        )
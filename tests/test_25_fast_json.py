@@ -0,0 +1,116 @@
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+from io import BytesIO
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_reviews
+
+DATA = OrderedDict((
+    ('datetime', datetime.datetime(2022, 8, 28, 15, 29, 1, 123456,
+                                   tzinfo=timezone.utc)),
+    ('naive', datetime.datetime(2022, 8, 28, 15, 29)),
+    ('date', datetime.date(2022, 8, 28)),
+    ('time', datetime.time(15, 29, 1)),
+    ('duration', datetime.timedelta(minutes=90)),
+    ('decimal', decimal.Decimal('7.25')),
+    ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+    ('username', 'Пользователь_ёЁ_😀'),
+    ('separators', 'строка абзац конец'),
+    ('lazy', gettext_lazy('Ленивая строка')),
+    ('keys', {1: 'один', 2: None}),
+    ('nested', [OrderedDict((('b', True), ('a', 1))), (), None]),
+))
+
+
+def render_both(data, accepted_media_type=None):
+    from api.renderers import FastJSONRenderer
+    return (
+        FastJSONRenderer().render(data, accepted_media_type),
+        JSONRenderer().render(data, accepted_media_type),
+    )
+
+
+class Test25FastJSON:
+
+    def test_01_renderer_parity(self):
+        fast, expected = render_both(DATA)
+        assert fast == expected, (
+            'Проверьте, что FastJSONRenderer отдаёт те же байты, '
+            'что и JSONRenderer'
+        )
+        assert b'\\u2028' in fast
+
+    def test_02_renderer_fallback(self):
+        for data in ({'big': 2 ** 70}, None, []):
+            fast, expected = render_both(data)
+            assert fast == expected
+        for data in ({'float': [1e16, 1e-7, 1.5, -0.0]},
+                     {'decimal': decimal.Decimal('1E+16')},
+                     {1e16: 'ключ'}):
+            fast, expected = render_both(data)
+            assert fast == expected, (
+                'Проверьте, что числа с плавающей точкой рендерятся '
+                'как в JSONRenderer'
+            )
+        from api.renderers import FastJSONRenderer
+        for value in (float('nan'), float('inf')):
+            with pytest.raises(ValueError):
+                FastJSONRenderer().render({'nested': [{'rating': value}]})
+        fast, expected = render_both(DATA, 'application/json; indent=4')
+        assert fast == expected
+        with mock.patch('api.renderers.orjson', None):
+            fast, expected = render_both(DATA)
+        assert fast == expected, (
+            'Проверьте, что без orjson используется стандартный json'
+        )
+
+    def test_03_parser_parity(self):
+        from api.parsers import FastJSONParser
+        bodies = (
+            '{"username": "Пользователь", "score": 10, "text": "a\\u2028"}',
+            '[1, 2.5, null, true, {"nested": []}]',
+            f'{{"big": {2 ** 70}}}',
+        )
+        for body in bodies:
+            body = body.encode()
+            assert (FastJSONParser().parse(BytesIO(body))
+                    == JSONParser().parse(BytesIO(body)))
+        for body in (b'{"broken": ', b'{"score": NaN}'):
+            with pytest.raises(ParseError) as fast_error:
+                FastJSONParser().parse(BytesIO(body))
+            with pytest.raises(ParseError) as expected_error:
+                JSONParser().parse(BytesIO(body))
+            assert str(fast_error.value) == str(expected_error.value), (
+                'Проверьте, что ошибки разбора JSON не изменились'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_api_responses(self, admin_client, admin):
+        from django.core.cache import cache
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = admin_client.patch(
+            f'/api/v1/users/{admin.username}/',
+            data=json.dumps({'first_name': 'Администратор ёЁ'}),
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+        assert response.json()['first_name'] == 'Администратор ёЁ'
+        for url in ('/api/v1/titles/',
+                    f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                    '/api/v1/users/'):
+            cache.clear()
+            fast = admin_client.get(url).content
+            cache.clear()
+            with mock.patch('api.renderers.orjson', None):
+                expected = admin_client.get(url).content
+            assert fast == expected, url
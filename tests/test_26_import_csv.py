@@ -0,0 +1,204 @@
+import datetime
+import re
+import shutil
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'api_yamdb/static/data'
+
+
+def import_csv(*args, path=None):
+    if path is not None:
+        args += ('--path', str(path))
+    stdout = StringIO()
+    call_command('import_csv', *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+def copy_data(tmp_path):
+    data = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, data)
+    return data
+
+
+def get_counts(output, name):
+    match = re.search(
+        rf'^{name}: добавлено (\d+), обновлено (\d+), без изменений (\d+)',
+        output, re.MULTILINE)
+    assert match, output
+    return tuple(map(int, match.groups()))
+
+
+class Test26ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_keeps_csv_pub_date(self):
+        from reviews.models import Comment, Review
+        import_csv()
+        review = Review.objects.get(pk=1)
+        assert review.pub_date == datetime.datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=datetime.timezone.utc), (
+            'Проверьте, что при импорте сохраняется `pub_date` из csv'
+        )
+        assert Comment.objects.get(pk=1).pub_date.year == 2020
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_repeated_upsert_is_noop(self):
+        output = import_csv('--upsert')
+        inserted, updated, unchanged = get_counts(output, 'Review')
+        assert inserted > 0 and updated == 0
+        output = import_csv('--upsert')
+        assert get_counts(output, 'Review') == (0, 0, inserted), (
+            'Проверьте, что повторный `--upsert` не перезаписывает '
+            'неизменившиеся строки'
+        )
+        assert re.search(r'добавлено связей 0, без изменений [1-9]', output), (
+            'Проверьте, что для связей жанров выводится число новых '
+            'и неизменившихся строк'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_upsert_after_plain_import(self):
+        import_csv()
+        _, updated, _ = get_counts(import_csv('--upsert'), 'Review')
+        assert updated == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_upsert_touches_only_changed_titles(self):
+        from reviews.models import Review, Title
+        from reviews.signals import bulk_data_changed
+        sent = []
+
+        def receiver(sender, models, **kwargs):
+            sent.append(set(models))
+
+        bulk_data_changed.connect(receiver)
+        try:
+            import_csv()
+            assert sent and Review in sent[-1]
+            sent.clear()
+            import_csv('--upsert')
+            assert not sent, (
+                'Проверьте, что повторный импорт без изменений не сбрасывает '
+                'кэш ответов'
+            )
+            review = Review.objects.get(pk=1)
+            Review.objects.filter(pk=1).update(score=review.score % 10 + 1)
+            Title.objects.exclude(pk=review.title_id).update(rating=0)
+            import_csv('--upsert')
+        finally:
+            bulk_data_changed.disconnect(receiver)
+        assert sent == [{Review, Title}], (
+            'Проверьте, что сигнал отправляется только для изменившихся '
+            'моделей'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) // len(scores)
+        assert not Title.objects.exclude(
+            pk=review.title_id).exclude(rating=0).exists(), (
+            'Проверьте, что рейтинг пересчитывается только для произведений '
+            'с изменёнными отзывами'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('workers', ('1', '2'))
+    def test_05_invalid_row_reported(self, tmp_path, capsys, workers):
+        from reviews.models import Genre
+        data = copy_data(tmp_path)
+        genres = (data / 'genre.csv').read_text(encoding='utf-8')
+        (data / 'genre.csv').write_text(
+            genres.rstrip('\n')
+            + '\n100,Лишнее,extra,значение\n101,Неполная\n',
+            encoding='utf-8')
+        output = import_csv('--workers', workers, path=data)
+        printed = capsys.readouterr().out
+        assert 'genre.csv' in printed and 'число значений' in printed, (
+            'Проверьте, что строка с лишними или недостающими значениями '
+            'отклоняется как неверная, в том числе в воркере'
+        )
+        assert 'genre.csv' not in output
+        assert not Genre.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_workers_match_serial_import(self):
+        from reviews.models import Title
+        output = import_csv('--workers', '2')
+        assert 'разбор' in output, (
+            'Проверьте, что с `--workers` файлы разбираются в воркерах'
+        )
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        output = import_csv('--upsert')
+        for name in ('User', 'Category', 'Genre', 'Title', 'Review',
+                     'Comment'):
+            inserted, updated, _ = get_counts(output, name)
+            assert inserted == updated == 0, (
+                'Проверьте, что импорт с `--workers` записывает те же '
+                f'данные `{name}`, что и последовательный'
+            )
+        assert 'добавлено связей 0' in output
+        assert dict(Title.objects.values_list('pk', 'rating')) == ratings
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_orphan_genre_links_reported(self, tmp_path):
+        from reviews.models import Title
+        data = copy_data(tmp_path)
+        links = (data / 'genre_title.csv').read_text(encoding='utf-8')
+        valid = len(links.split()) - 1
+        (data / 'genre_title.csv').write_text(
+            links.rstrip('\n') + '\n1000,99999,1\n1001,1,99999\n',
+            encoding='utf-8')
+        output = import_csv(path=data)
+        assert re.search(
+            rf'добавлено связей {valid}, без изменений 0, '
+            r'пропущено без пары 2\.', output), output
+        for link in ({'title_id': 99999, 'genre_id': 1},
+                     {'title_id': 1, 'genre_id': 99999}):
+            assert f'нет объекта для связи {link}' in output, (
+                'Проверьте, что связи жанров без произведения или жанра '
+                'перечисляются в отчёте'
+            )
+        assert Title.genre.through.objects.count() == valid, (
+            'Проверьте, что корректные связи импортируются несмотря '
+            'на связи без пары'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_streams_in_batches(self):
+        from django.db.models.query import QuerySet
+
+        from reviews.management.commands import import_csv as command
+        from reviews.models import Review
+        validate_row = command.validate_row
+        bulk_create = QuerySet.bulk_create
+        validated = []
+        batches = []
+
+        def validate(model_, row):
+            validated.append(model_['model'])
+            return validate_row(model_, row)
+
+        def create(queryset, objs, *args, **kwargs):
+            if queryset.model is Review:
+                batches.append((len(objs), validated.count(Review)))
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(command, 'validate_row', validate), \
+                mock.patch.object(QuerySet, 'bulk_create', create):
+            import_csv('--batch-size', '10')
+        total = Review.objects.count()
+        assert total > 10
+        assert [size for size, _ in batches] == (
+            [10] * (total // 10) + [total % 10] * bool(total % 10)), (
+            'Проверьте, что отзывы записываются пачками по `--batch-size`'
+        )
+        for number, (_, read) in enumerate(batches, 1):
+            assert read <= number * 10, (
+                'Проверьте, что csv файл читается потоково: к записи '
+                'пачки прочитано не больше строк, чем в записанных пачках'
+            )
@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+class Test27GenerateDataset:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_generated_pub_date(self):
+        from reviews.management.commands.generate_dataset import START_DATE
+        from reviews.models import Comment, Review
+        call_command('generate_dataset', users=20, titles=20,
+                     reviews_per_title=3, comments_per_review=1, seed=1,
+                     stdout=StringIO())
+        for model in (Review, Comment):
+            dates = list(model.objects.order_by('id').values_list(
+                'pub_date', flat=True))
+            assert dates and all(date >= START_DATE for date in dates)
+            assert max(dates).year <= 2022, (
+                'Проверьте, что generate_dataset сохраняет сгенерированные '
+                '`pub_date`, а не время вставки'
+            )
+            assert dates != sorted(dates), (
+                'Проверьте, что порядок `pub_date` не совпадает с порядком id'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_output_imported_with_path(self, tmp_path):
+        from reviews.models import Comment, Review, Title
+        call_command('generate_dataset', users=20, titles=20,
+                     reviews_per_title=3, comments_per_review=1, seed=1,
+                     output=str(tmp_path), stdout=StringIO())
+        assert not Title.objects.exists()
+        stdout = StringIO()
+        call_command('import_csv', '--path', str(tmp_path), stdout=stdout)
+        assert Title.objects.count() == 20, (
+            'Проверьте, что `import_csv --path` загружает csv файлы, '
+            'созданные `generate_dataset --output`'
+        )
+        for model, file_name in ((Review, 'review.csv'),
+                                 (Comment, 'comments.csv')):
+            with open(tmp_path / file_name, encoding='utf-8') as file:
+                rows = sum(1 for _ in file) - 1
+            assert model.objects.count() == rows > 0